@@ -1,7 +1,18 @@
 import bpy
 from pathlib import Path
+import collections
+import csv
+import functools
+import itertools
 import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from bpy.app.handlers import persistent
 from bpy_extras.io_utils import ExportHelper, ImportHelper
+from . import core
+from . import live
 
 bl_info = {
     'name': 'Multi object shape key',
@@ -22,30 +33,1448 @@ def get_settings(context):
     return context.scene.taremin_mos
 
 
+def get_selected_objects(context):
+    """Get the selected objects, also from contexts without a screen (handlers, timers)."""
+    objects = getattr(context, "selected_objects", None)
+    if objects is None:
+        objects = list(context.view_layer.objects.selected)
+    return objects
+
+
+def get_shape_keys(obj):
+    """Get the shape key datablock of an object, or None if it has none."""
+    return getattr(obj.data, "shape_keys", None)
+
+
+def iter_unique_shape_keys(objects):
+    """Yield (object, shape key datablock) for each datablock of the objects once.
+
+    Objects that share their data (linked duplicates) yield only the first of
+    them, and objects without shape keys are left out.
+    """
+    done = set()
+    for obj in objects:
+        shape_keys = get_shape_keys(obj)
+        if shape_keys is None or shape_keys.as_pointer() in done:
+            continue
+        done.add(shape_keys.as_pointer())
+        yield obj, shape_keys
+
+
+def get_update_shape_keys(id_data):
+    """Get the shape key datablock of an ID reported by a depsgraph update (Key, Mesh or Object), or None."""
+    id_data = getattr(id_data, "original", id_data)
+    if isinstance(id_data, bpy.types.Key):
+        return id_data
+    if isinstance(id_data, bpy.types.Object):
+        return get_shape_keys(id_data)
+    return getattr(id_data, "shape_keys", None)
+
+
+def get_preferences(context):
+    """Get the addon preferences, or None if the addon is not enabled through the preferences."""
+    addon = context.preferences.addons.get(__name__)
+    return addon.preferences if addon else None
+
+
+class Measurement:
+    """One timed call, recorded into the profiler when the block exits."""
+    __slots__ = ("profiler", "name", "start", "objects", "keys")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.objects = 0
+        self.keys = 0
+
+    def count(self, objects=0, keys=0):
+        self.objects += objects
+        self.keys += keys
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.add(self.name, time.perf_counter() - self.start, self.objects, self.keys)
+        return False
+
+
+class NullMeasurement:
+    """Stand-in for Measurement while profiling is disabled."""
+
+    def count(self, objects=0, keys=0):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class Profiler:
+    """Opt-in call statistics of the addon's hot paths.
+
+    While disabled, measure() returns a shared no-op object, so instrumented
+    code only pays for one attribute check.
+    """
+    RECORD_FIELDS = ("time", "name", "elapsed", "objects", "keys")
+
+    def __init__(self, capacity=1000):
+        self.enabled = False
+        self.records = collections.deque(maxlen=capacity)
+        # name -> [calls, total time, objects, keys]
+        self.totals = {}
+        self.null = NullMeasurement()
+
+    def measure(self, name):
+        if not self.enabled:
+            return self.null
+        return Measurement(self, name)
+
+    def add(self, name, elapsed, objects, keys):
+        self.records.append((time.time(), name, elapsed, objects, keys))
+        total = self.totals.get(name)
+        if total is None:
+            total = self.totals[name] = [0, 0.0, 0, 0]
+        total[0] += 1
+        total[1] += elapsed
+        total[2] += objects
+        total[3] += keys
+
+    def set_capacity(self, capacity):
+        if capacity != self.records.maxlen:
+            self.records = collections.deque(self.records, maxlen=capacity)
+
+    def reset(self):
+        self.records.clear()
+        self.totals.clear()
+
+    def dump(self, filepath):
+        """Write the recorded calls to a CSV file, or the totals and calls to a JSON file."""
+        if filepath.lower().endswith(".csv"):
+            with open(filepath, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(self.RECORD_FIELDS)
+                writer.writerows(self.records)
+            return
+
+        data = {
+            "totals": {
+                name: {"calls": calls, "total_time": total_time, "objects": objects, "keys": keys}
+                for name, (calls, total_time, objects, keys) in self.totals.items()
+            },
+            "records": [dict(zip(self.RECORD_FIELDS, record)) for record in self.records],
+        }
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+profiler = Profiler()
+
+
+def profiled(name):
+    """Decorator that records calls of an operator, panel or UIList callback while profiling is enabled.
+
+    Blender checks the number of arguments of registered callbacks
+    (co_argcount), so the wrapper takes exactly the positional arguments of
+    the wrapped function: (self, context) or (self, context, data, propname).
+    """
+    def decorator(func):
+        argcount = func.__code__.co_argcount
+        if argcount == 2:
+            def wrapper(self, context):
+                if not profiler.enabled:
+                    return func(self, context)
+                with profiler.measure(name):
+                    return func(self, context)
+        elif argcount == 4:
+            def wrapper(self, context, data, propname):
+                if not profiler.enabled:
+                    return func(self, context, data, propname)
+                with profiler.measure(name):
+                    return func(self, context, data, propname)
+        else:
+            raise TypeError(f"profiled() does not support {func.__qualname__} with {argcount} arguments")
+        return functools.wraps(func)(wrapper)
+    return decorator
+
+
+def update_profiling(self, context):
+    profiler.enabled = self.enable_profiling
+    profiler.set_capacity(self.profile_capacity)
+
+
+def get_selection_state(context):
+    """Fingerprint of the selection: view layer, active object, selected objects and total object count.
+
+    The selected objects are compared as a set of pointers, so selecting as
+    many other objects (e.g. a box select) is noticed too. Building it walks
+    the selection once, which is no more than a single value write costs; it
+    is only taken on scene updates and when a cache is built.
+    """
+    view_layer = context.view_layer
+    objects = view_layer.objects
+    active = objects.active
+    return (view_layer.as_pointer(), active.as_pointer() if active else 0,
+            frozenset(obj.as_pointer() for obj in objects.selected), len(objects))
+
+
+class ShapekeyIndex:
+    """Index from shape key name to the (object, key_block) pairs of the selection.
+
+    The index is built once per selection so that slider updates only have to
+    write values instead of calling key_blocks.find() on every object.
+    The depsgraph handler drops it when the selection state changes or a
+    selected key layout changes, and the message bus handler when a key is
+    renamed.
+    """
+
+    def __init__(self):
+        self.blocks = None
+        self.state = None
+
+    def build(self, context, objects=None):
+        if objects is None:
+            objects = get_selected_objects(context)
+        blocks = {}
+        for obj in objects:
+            shape_keys = get_shape_keys(obj)
+            if shape_keys is None:
+                continue
+            for block in shape_keys.key_blocks:
+                blocks.setdefault(block.name, []).append((obj, block))
+        self.blocks = blocks
+        self.state = get_selection_state(context)
+
+    def invalidate(self):
+        self.blocks = None
+        self.state = None
+
+    def validate(self, state):
+        """Drop the index if the selection changed since it was built."""
+        if self.blocks is not None and state != self.state:
+            self.invalidate()
+
+    def get(self, context, name):
+        """Get the (object, key_block) pairs for a shape key name, building the index if needed."""
+        if self.blocks is None:
+            self.build(context)
+        return self.blocks.get(name, ())
+
+
+shapekey_index = ShapekeyIndex()
+
+
+class ShapekeyNameCache:
+    """Shape key names of each shape key datablock, as a (tuple, frozenset) pair.
+
+    Objects that share their mesh data share the entry, so each datablock is
+    scanned only once. Value changes (sliders, Set All, playback) keep the
+    entries: they are checked lazily against the number of key blocks, which
+    catches added and removed keys, and dropped when a key is renamed (see
+    on_shapekey_renamed) or moved (see validate_order).
+    """
+
+    def __init__(self):
+        # pointer -> (key block count, layout)
+        self.entries = {}
+        # pointer -> (layout, mirror table)
+        self.mirror_tables = {}
+
+    def get(self, shape_keys):
+        pointer = shape_keys.as_pointer()
+        count = len(shape_keys.key_blocks)
+        entry = self.entries.get(pointer)
+        if entry is None or entry[0] != count:
+            entry = self.entries[pointer] = (count, core.make_layout(
+                block.name for block in shape_keys.key_blocks))
+        return entry[1]
+
+    def get_mirror_table(self, shape_keys):
+        """Get the (left indices, right indices) arrays of the paired L/R keys (see core.mirror_table).
+
+        The table is built from the cached names and rebuilt when they are.
+        """
+        pointer = shape_keys.as_pointer()
+        layout = self.get(shape_keys)
+        entry = self.mirror_tables.get(pointer)
+        if entry is None or entry[0] is not layout:
+            left, right = core.mirror_table(layout[0])
+            entry = self.mirror_tables[pointer] = (
+                layout, (np.array(left, dtype=np.intp), np.array(right, dtype=np.intp)))
+        return entry[1]
+
+    def validate_updates(self, updates):
+        """Drop the entries whose key count changed, for the data-blocks of a depsgraph update.
+
+        Returns True if a key layout changed.
+        """
+        changed = False
+        for update in updates:
+            shape_keys = get_update_shape_keys(update.id)
+            if shape_keys is None:
+                continue
+            entry = self.entries.get(shape_keys.as_pointer())
+            if entry is not None and entry[0] != len(shape_keys.key_blocks):
+                self.discard(shape_keys.as_pointer())
+                changed = True
+        return changed
+
+    def validate_order(self, obj):
+        """Drop the entry of an object's shape keys if its active key is not where the entry has it.
+
+        Moving a key (which also keeps the count and the names) moves the
+        active key, so this catches reordering in O(1). Returns True if the
+        entry was dropped.
+        """
+        shape_keys = get_shape_keys(obj) if obj is not None else None
+        if shape_keys is None:
+            return False
+        entry = self.entries.get(shape_keys.as_pointer())
+        if entry is None:
+            return False
+        names = entry[1][0]
+        index = obj.active_shape_key_index
+        if 0 <= index < min(len(names), len(shape_keys.key_blocks)) and names[index] != shape_keys.key_blocks[index].name:
+            self.discard(shape_keys.as_pointer())
+            return True
+        return False
+
+    def discard(self, pointer):
+        self.entries.pop(pointer, None)
+        self.mirror_tables.pop(pointer, None)
+
+    def clear(self):
+        self.entries.clear()
+        self.mirror_tables.clear()
+
+
+shapekey_names = ShapekeyNameCache()
+
+
+class KeyDisplacementCache:
+    """Largest vertex displacement of each key block, per shape key datablock.
+
+    Reading the coordinates of every key is expensive, so the measurements
+    are kept until the depsgraph reports a geometry update of the mesh or its
+    shape keys.
+    """
+
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, shape_keys):
+        return self.entries.get(shape_keys.as_pointer())
+
+    def set(self, shape_keys, displacements):
+        self.entries[shape_keys.as_pointer()] = displacements
+        return displacements
+
+    def discard(self, pointer):
+        self.entries.pop(pointer, None)
+
+    def discard_updates(self, updates):
+        """Drop the entries of the data-blocks whose geometry a depsgraph update reports as changed."""
+        for update in updates:
+            if not update.is_updated_geometry:
+                continue
+            id_data = getattr(update.id, "original", update.id)
+            if isinstance(id_data, bpy.types.Key):
+                self.entries.pop(id_data.as_pointer(), None)
+                continue
+            shape_keys = getattr(id_data, "shape_keys", None)
+            if shape_keys is not None:
+                self.entries.pop(shape_keys.as_pointer(), None)
+
+    def clear(self):
+        self.entries.clear()
+
+
+key_displacements = KeyDisplacementCache()
+
+
+class EmptyKeyReport:
+    """Names of the shape keys that the last analysis found to have no effect.
+
+    Used by the "Hide Inactive" filter of the shape key list.
+    """
+
+    def __init__(self):
+        self.names = frozenset()
+
+    def set(self, names):
+        self.names = frozenset(names)
+
+    def clear(self):
+        self.names = frozenset()
+
+
+empty_keys = EmptyKeyReport()
+
+
+class SelectionNameCache:
+    """Names of the selected objects, for drawing the panel.
+
+    Redraws happen on every mouse hover, so the names are kept until the
+    selection state (see get_selection_state) changes instead of walking the
+    selection on each redraw. Slider and frame changes also update the
+    scene, but keep the state and therefore the names.
+    """
+
+    def __init__(self):
+        self.state = None
+        self.names = []
+
+    def get(self, context):
+        if self.state is None or self.state[0] != context.view_layer.as_pointer():
+            self.state = get_selection_state(context)
+            self.names = [obj.name for obj in get_selected_objects(context)]
+        return self.names
+
+    def validate(self, state):
+        """Drop the names if the selection changed."""
+        if self.state is not None and state != self.state:
+            self.clear()
+
+    def clear(self):
+        self.state = None
+        self.names = []
+
+
+selection_names = SelectionNameCache()
+
+
+class ObjectNameMap:
+    """Map from object name to the objects of the view layer.
+
+    bpy.data.objects.get() scans the whole collection, so resolving a preset
+    name by name is O(objects) each. Objects are found by name_full, and by
+    plain name (local objects first, then linked ones). The map is dropped
+    when the number of objects changes (see get_selection_state), and hits
+    are checked against the object's name to catch renames. A miss rebuilds
+    the map at most once between two depsgraph updates, so renamed objects
+    are found without rebuilding for every missing name.
+    """
+
+    def __init__(self):
+        self.state = None
+        self.objects = {}
+        self.fresh = False
+
+    def get(self, context, name):
+        if self.state is None or self.state[0] != context.view_layer.as_pointer():
+            self.build(context)
+        obj = self.objects.get(name)
+        if obj is not None and name not in (obj.name, obj.name_full):
+            self.build(context)
+            obj = self.objects.get(name)
+        elif obj is None and not self.fresh:
+            self.build(context)
+            obj = self.objects.get(name)
+        return obj
+
+    def build(self, context):
+        self.state = get_selection_state(context)
+        self.objects = {obj.name_full: obj for obj in context.view_layer.objects}
+        for obj in list(self.objects.values()):
+            if obj.library is not None:
+                self.objects.setdefault(obj.name, obj)
+        self.fresh = True
+
+    def expire_misses(self):
+        """Let the next miss rebuild the map (called on every depsgraph update)."""
+        self.fresh = False
+
+    def validate(self, state):
+        """Drop the map if the objects of the view layer changed."""
+        if self.state is not None and (state[0], state[3]) != (self.state[0], self.state[3]):
+            self.clear()
+
+    def clear(self):
+        self.state = None
+        self.objects = {}
+        self.fresh = False
+
+
+view_layer_objects = ObjectNameMap()
+
+# パネルの「Selected Objects」に 1 ページあたり表示するオブジェクト数
+SELECTED_OBJECTS_PER_PAGE = 10
+
+
+def write_values(context, values):
+    """Write {shape key name: value} to the key blocks of the selected objects.
+
+    Key blocks that already have the value are not touched.
+    Returns the number of key blocks written.
+    """
+    written = 0
+    for name, value in values.items():
+        for obj, block in shapekey_index.get(context, name):
+            # 値が同じキーブロックに書き込むと無駄に再評価が走るので飛ばす
+            if block.value != value:
+                block.value = value
+                written += 1
+    return written
+
+
+def read_key_values(shape_keys):
+    """Read the values of all key blocks into a float32 array."""
+    values = np.empty(len(shape_keys.key_blocks), dtype=np.float32)
+    shape_keys.key_blocks.foreach_get("value", values)
+    return values
+
+
+def read_selection_values(objects, names):
+    """Aggregate the current values of the named shape keys over the objects.
+
+    Each shape key datablock is read once with foreach_get, and datablocks with
+    the same key layout are stacked into one array so that min / max / mean
+    are computed per layout in single vectorized passes. The mean counts
+    every object, also those that share their data. Returns (minimum, maximum,
+    mean) float32 arrays in the order of names; names that none of the
+    objects has get 0.0.
+    """
+    with profiler.measure("read_selection_values") as measurement:
+        # データごとに 1 回だけ読み込み、共有しているオブジェクトの数を重みにする
+        entries = {}
+        for obj in objects:
+            shape_keys = get_shape_keys(obj)
+            if shape_keys is None:
+                continue
+            entry = entries.get(shape_keys.as_pointer())
+            if entry is None:
+                entries[shape_keys.as_pointer()] = [
+                    shapekey_names.get(shape_keys)[0], read_key_values(shape_keys), 1]
+            else:
+                entry[2] += 1
+
+        groups = {}
+        for layout, values, count in entries.values():
+            rows, counts = groups.setdefault(layout, ([], []))
+            rows.append(values)
+            counts.append(count)
+
+        # レイアウトごとに集計してから、一覧の位置へまとめて書き込む
+        positions = {name: i for i, name in enumerate(names)}
+        parts = []
+        for layout, (rows, counts) in groups.items():
+            index = np.array(list(map(positions.get, layout, itertools.repeat(-1))), dtype=np.intp)
+            listed = index >= 0
+            if len(rows) == 1:
+                stack_min = stack_max = rows[0][listed]
+                stack_sum = stack_min * np.float64(counts[0])
+            else:
+                stack = np.stack(rows)[:, listed]
+                stack_min = stack.min(axis=0)
+                stack_max = stack.max(axis=0)
+                stack_sum = np.array(counts, dtype=np.float64) @ stack
+            parts.append((index[listed], stack_min, stack_max, stack_sum, sum(counts)))
+
+        size = len(names)
+        minimum = np.full(size, np.inf, dtype=np.float32)
+        maximum = np.full(size, -np.inf, dtype=np.float32)
+        total = np.zeros(size, dtype=np.float64)
+        count = np.zeros(size, dtype=np.float64)
+        if parts:
+            index = np.concatenate([part[0] for part in parts])
+            np.minimum.at(minimum, index, np.concatenate([part[1] for part in parts]))
+            np.maximum.at(maximum, index, np.concatenate([part[2] for part in parts]))
+            total += np.bincount(index, np.concatenate([part[3] for part in parts]), size)
+            count += np.bincount(index, np.repeat([part[4] for part in parts], [len(part[0]) for part in parts]), size)
+
+        missing = count == 0
+        minimum[missing] = 0.0
+        maximum[missing] = 0.0
+        mean = np.divide(total, count, out=np.zeros(size), where=~missing).astype(np.float32)
+        measurement.count(objects=len(objects), keys=size)
+        return minimum, maximum, mean
+
+
+def write_key_values(shape_keys, values):
+    """Write the values of all key blocks and tag the shape key datablock for re-evaluation.
+
+    foreach_set skips the RNA update, so the Key itself has to be tagged for
+    its evaluated copy (and the meshes using it) to pick up the new values.
+    """
+    shape_keys.key_blocks.foreach_set("value", values)
+    shape_keys.update_tag()
+
+
+def write_values_bulk(objects, values):
+    """Write {shape key name: value} with one foreach_get/foreach_set pair per shape key datablock.
+
+    Objects that share their data are written only once. No update callbacks are
+    involved, so the datablocks are tagged for re-evaluation explicitly.
+    Returns the number of shape key datablocks that changed.
+    """
+    with profiler.measure("write_values_bulk") as measurement:
+        changed = 0
+        for obj, shape_keys in iter_unique_shape_keys(objects):
+
+            names = shapekey_names.get(shape_keys)[0]
+            indices = [i for i, name in enumerate(names) if name in values]
+            if not indices:
+                continue
+
+            current = read_key_values(shape_keys)
+            updated = current.copy()
+            updated[indices] = [values[names[i]] for i in indices]
+            if np.array_equal(updated, current):
+                continue
+
+            write_key_values(shape_keys, updated)
+            changed += 1
+            measurement.count(objects=1, keys=len(indices))
+        return changed
+
+
+def key_block_data_path(name):
+    """Get the data path of a key block's value, relative to its shape key datablock."""
+    escaped = name.replace('\\', '\\\\').replace('"', '\\"')
+    return f'key_blocks["{escaped}"].value'
+
+
+def ensure_fcurves(id_data):
+    """Get the F-curve collection of an ID's action, creating the action if needed."""
+    anim = id_data.animation_data or id_data.animation_data_create()
+    if anim.action is None:
+        anim.action = bpy.data.actions.new(name=f"{id_data.name}Action")
+    action = anim.action
+    if not hasattr(anim, "action_slot"):
+        return action.fcurves
+
+    # Blender 4.4 以降はスロットごとのチャンネルバッグに F カーブがある
+    from bpy_extras import anim_utils
+    if anim.action_slot is None:
+        anim.action_slot = action.slots.new(id_type=id_data.id_type, name=id_data.name)
+    return anim_utils.action_ensure_channelbag_for_slot(action, anim.action_slot).fcurves
+
+
+def read_keyframe_points(points, attr):
+    """Read a 2D attribute of all keyframe points into an (N, 2) float32 array."""
+    values = np.empty(len(points) * 2, dtype=np.float32)
+    points.foreach_get(attr, values)
+    return values.reshape(-1, 2)
+
+
+def insert_keyframes_bulk(shape_keys, indices, frames, values):
+    """Insert keyframes for several key blocks of one shape key datablock.
+
+    indices are key block indices, frames is a sequence of F frame numbers and
+    values an (F, len(indices)) array. Existing keys on the same frames get
+    the new value, with their handles moved along; their interpolation,
+    easing and handle types are kept. Keys on new frames are added, and the
+    points of each F-curve are written with one foreach_set per attribute.
+    """
+    names = shapekey_names.get(shape_keys)[0]
+    fcurves = ensure_fcurves(shape_keys)
+    frames = np.asarray(frames, dtype=np.float32)
+    values = np.asarray(values, dtype=np.float32).reshape(len(frames), len(indices))
+    order = np.argsort(frames)
+    sorted_frames = frames[order]
+
+    for column, index in enumerate(indices):
+        data_path = key_block_data_path(names[index])
+        fcurve = fcurves.find(data_path) or fcurves.new(data_path)
+        points = fcurve.keyframe_points
+        co = np.column_stack((frames, values[:, column]))
+
+        existing = read_keyframe_points(points, "co")
+        handle_left = read_keyframe_points(points, "handle_left")
+        handle_right = read_keyframe_points(points, "handle_right")
+        if len(existing):
+            # 同じフレームの既存キーは値だけを置き換え、ハンドルも同じだけ動かす
+            positions = np.minimum(np.searchsorted(sorted_frames, existing[:, 0]), len(frames) - 1)
+            hit = sorted_frames[positions] == existing[:, 0]
+            delta = co[order[positions[hit]], 1] - existing[hit, 1]
+            existing[hit, 1] += delta
+            handle_left[hit, 1] += delta
+            handle_right[hit, 1] += delta
+            added = co[~np.isin(frames, existing[:, 0])]
+        else:
+            added = co
+
+        # 新しいキーだけを末尾に追加する (並び替えは fcurve.update() が行う)
+        points.add(len(added))
+        points.foreach_set("co", np.concatenate((existing, added)).ravel())
+        points.foreach_set("handle_left", np.concatenate((handle_left, added)).ravel())
+        points.foreach_set("handle_right", np.concatenate((handle_right, added)).ravel())
+        fcurve.update()
+
+
+# シェイプキーをまとめて動かすマスタープロパティ (シーンのカスタムプロパティ) の名前の接頭辞
+MASTER_PROPERTY_PREFIX = "mos:"
+
+
+def master_property_name(name):
+    """Get the name of the scene custom property that drives a shape key name."""
+    return MASTER_PROPERTY_PREFIX + name
+
+
+def master_data_path(name):
+    """Get the data path of the master property of a shape key name, relative to the scene."""
+    escaped = master_property_name(name).replace('\\', '\\\\').replace('"', '\\"')
+    return f'["{escaped}"]'
+
+
+def ensure_master_property(scene, name, value):
+    """Create the master property of a shape key name on the scene if it does not exist."""
+    prop = master_property_name(name)
+    if prop in scene:
+        return
+    scene[prop] = float(value)
+    if hasattr(scene, "id_properties_ui"):
+        scene.id_properties_ui(prop).update(min=-10.0, max=10.0, soft_min=0.0, soft_max=1.0)
+
+
+def bind_to_master(shape_keys, names, scene):
+    """Drive the named key blocks of a shape key datablock by their master properties.
+
+    The drivers use the plain expression "var", which Blender evaluates with
+    its simple expression evaluator instead of Python, so playback and
+    rendering propagate the values without running any Python.
+    """
+    for name in names:
+        fcurve = shape_keys.driver_add(key_block_data_path(name))
+        # driver_add() が追加する Generator モディファイアは不要なので削除する
+        for modifier in list(fcurve.modifiers):
+            fcurve.modifiers.remove(modifier)
+        driver = fcurve.driver
+        driver.type = 'SCRIPTED'
+        for variable in list(driver.variables):
+            driver.variables.remove(variable)
+        variable = driver.variables.new()
+        variable.name = "var"
+        variable.type = 'SINGLE_PROP'
+        target = variable.targets[0]
+        target.id_type = 'SCENE'
+        target.id = scene
+        target.data_path = master_data_path(name)
+        driver.expression = "var"
+    shape_keys.update_tag()
+
+
+def get_master_target(fcurve):
+    """Get the (scene, property name) a master driver reads, or None for other drivers."""
+    driver = fcurve.driver
+    if driver.type != 'SCRIPTED' or driver.expression != "var" or len(driver.variables) != 1:
+        return None
+    target = driver.variables[0].targets[0]
+    path = target.data_path
+    if target.id_type != 'SCENE' or target.id is None or not path.startswith('["' + MASTER_PROPERTY_PREFIX):
+        return None
+    prop = path[2:-2].replace('\\"', '"').replace('\\\\', '\\')
+    name = prop[len(MASTER_PROPERTY_PREFIX):]
+    if master_data_path(name) != path:
+        return None
+    return target.id, prop
+
+
+def unbind_from_master(shape_keys, names, bake=True):
+    """Remove the master drivers of the named key blocks of a shape key datablock.
+
+    With bake, each key block keeps the current value of its master property
+    as a static value. Returns the number of drivers removed.
+    """
+    anim = shape_keys.animation_data
+    if anim is None:
+        return 0
+    removed = 0
+    values = {}
+    for name in names:
+        data_path = key_block_data_path(name)
+        fcurve = anim.drivers.find(data_path)
+        if fcurve is None:
+            continue
+        master = get_master_target(fcurve)
+        if master is None:
+            continue
+        scene, prop = master
+        shape_keys.driver_remove(data_path)
+        values[name] = scene.get(prop, 0.0)
+        removed += 1
+    if bake and values:
+        current = read_key_values(shape_keys)
+        for i, name in enumerate(shapekey_names.get(shape_keys)[0]):
+            if name in values:
+                current[i] = values[name]
+        write_key_values(shape_keys, current)
+    return removed
+
+
+def get_used_master_properties():
+    """Get the (scene pointer, property name) pairs that some shape key driver reads."""
+    used = set()
+    for shape_keys in bpy.data.shape_keys:
+        anim = shape_keys.animation_data
+        if anim is None:
+            continue
+        for fcurve in anim.drivers:
+            master = get_master_target(fcurve)
+            if master is not None:
+                used.add((master[0].as_pointer(), master[1]))
+    return used
+
+
+def read_key_coordinates(block):
+    """Read the vertex coordinates of a key block into a flat float32 array."""
+    coordinates = np.empty(len(block.data) * 3, dtype=np.float32)
+    block.data.foreach_get("co", coordinates)
+    return coordinates
+
+
+def gather_mix(shape_keys, values):
+    """Read the coordinates needed to mix a shape key datablock with {name: value}.
+
+    Muted keys and keys with a value of 0.0 are left out; vertex group masks
+    are not applied. Every key block is read only once, also when it is the
+    relative key of several keys. Only relative datablocks can be mixed
+    (absolute ones are driven by the evaluation time, not by key values);
+    raises ValueError for the others.
+    Returns (basis, [(value, key, relative key)]) as float32 arrays, to be
+    combined by compute_mix.
+    """
+    if not shape_keys.use_relative:
+        raise ValueError(f"'{shape_keys.name}' uses absolute shape keys")
+    key_blocks = shape_keys.key_blocks
+    reference = shape_keys.reference_key
+    cache = {}
+
+    def read(block):
+        coordinates = cache.get(block.name)
+        if coordinates is None:
+            coordinates = cache[block.name] = read_key_coordinates(block)
+        return coordinates
+
+    deltas = []
+    for i, name in enumerate(shapekey_names.get(shape_keys)[0]):
+        value = values.get(name, 0.0)
+        block = key_blocks[i]
+        if value == 0.0 or block.mute or block == reference:
+            continue
+        relative = block.relative_key or reference
+        deltas.append((value, read(block), read(relative)))
+    return read(reference), deltas
+
+
+def compute_mix(basis, deltas):
+    """Compute basis + sum(value * (key - relative key)).
+
+    Only NumPy operations on whole arrays, which release the GIL, so several
+    datablocks can be mixed in parallel on worker threads.
+    """
+    result = basis.copy()
+    delta = np.empty_like(basis)
+    for value, key, relative in deltas:
+        np.subtract(key, relative, out=delta)
+        delta *= value
+        result += delta
+    return result
+
+
+def gather_deltas(shape_keys):
+    """Read the coordinates of every key block of a datablock and of its relative key.
+
+    The reference key, and keys that other keys are relative to, are not
+    measured since removing them would change the other keys. Returns (names,
+    [(key, relative key)], names of the keys left out) for
+    measure_displacements.
+    """
+    key_blocks = shape_keys.key_blocks
+    reference = shape_keys.reference_key
+    relatives = get_protected_key_names(shape_keys)
+    cache = {}
+
+    def read(block):
+        coordinates = cache.get(block.name)
+        if coordinates is None:
+            coordinates = cache[block.name] = read_key_coordinates(block)
+        return coordinates
+
+    names = []
+    deltas = []
+    for i, name in enumerate(shapekey_names.get(shape_keys)[0]):
+        block = key_blocks[i]
+        if name in relatives:
+            continue
+        names.append(name)
+        deltas.append((read(block), read(block.relative_key or reference)))
+    return names, deltas, relatives
+
+
+def get_protected_key_names(shape_keys):
+    """Get the names of the reference key and of the keys that other keys are relative to."""
+    names = {block.relative_key.name for block in shape_keys.key_blocks
+             if block.relative_key is not None and block.relative_key != block}
+    names.add(shape_keys.reference_key.name)
+    return names
+
+
+def measure_displacements(deltas):
+    """Get the largest vertex displacement of each (key, relative key) pair.
+
+    Only NumPy operations on whole arrays, so it can run on worker threads.
+    """
+    result = []
+    for key, relative in deltas:
+        delta = (key - relative).reshape(-1, 3)
+        if len(delta) == 0:
+            result.append(0.0)
+            continue
+        result.append(float(np.sqrt(np.einsum('ij,ij->i', delta, delta).max())))
+    return result
+
+
+def analyze_displacements(objects):
+    """Get {name: largest vertex displacement} of the shape keys of each datablock of the objects.
+
+    Keys that gather_deltas leaves out get an infinite displacement, so they
+    never count as empty on any datablock. Datablocks measured before are
+    taken from the cache. The others are read on the main thread and measured
+    on a thread pool.
+    """
+    with profiler.measure("analyze_displacements") as measurement:
+        results = []
+        pending = []
+        with ThreadPoolExecutor() as executor:
+            for obj, shape_keys in iter_unique_shape_keys(objects):
+                cached = key_displacements.get(shape_keys)
+                if cached is not None:
+                    results.append(cached)
+                    continue
+                names, deltas, protected = gather_deltas(shape_keys)
+                pending.append((shape_keys, names, protected, executor.submit(measure_displacements, deltas)))
+                measurement.count(objects=1, keys=len(names))
+            for shape_keys, names, protected, future in pending:
+                # 除外したキーは無限大の移動量として扱い、他のデータで空でも空と判定されないようにする
+                displacements = dict.fromkeys(protected, math.inf)
+                displacements.update(zip(names, future.result()))
+                results.append(key_displacements.set(shape_keys, displacements))
+        return results
+
+
+def capture_snapshot(objects):
+    """Capture the shape key values of the objects into a packed snapshot string.
+
+    Returns (packed data, captured objects), the objects in the order of the
+    packed entries.
+    """
+    entries = []
+    captured = []
+    for obj in objects:
+        shape_keys = get_shape_keys(obj)
+        if shape_keys is None:
+            continue
+        entries.append((obj.name, shapekey_names.get(shape_keys)[0], read_key_values(shape_keys)))
+        captured.append(obj)
+    return core.pack_snapshot(entries), captured
+
+
+def resolve_snapshot(snapshot):
+    """Unpack a snapshot into (object or None, object name, names, values) entries.
+
+    Entries are resolved through the object references stored with the
+    snapshot, so renamed objects are still found. Entries without a live
+    reference (older or imported snapshots, deleted objects) fall back to
+    their name, looked up in one name map of the file.
+    """
+    references = snapshot.objects
+    name_map = None
+    entries = []
+    for i, (obj_name, names, values) in enumerate(core.unpack_snapshot(snapshot.data)):
+        obj = references[i].object if i < len(references) else None
+        if obj is None:
+            if name_map is None:
+                name_map = get_object_name_map()
+            obj = name_map.get(obj_name)
+        entries.append((obj, obj_name, names, values))
+    return entries
+
+
+def get_snapshot_data(snapshot):
+    """Get the packed data of a snapshot with the current names of its objects (for exporting)."""
+    entries = resolve_snapshot(snapshot)
+    if all(obj is None or obj.name == obj_name for obj, obj_name, names, values in entries):
+        return snapshot.data
+    return core.pack_snapshot([
+        (obj.name if obj is not None else obj_name, names, values)
+        for obj, obj_name, names, values in entries
+    ])
+
+
+def restore_snapshot(snapshot):
+    """Write the values of a snapshot back to its objects.
+
+    Keys are matched by name when an object's key layout changed since the
+    capture. Returns (restored object count, missing object names).
+    """
+    restored = 0
+    missing = []
+    for obj, obj_name, names, values in resolve_snapshot(snapshot):
+        shape_keys = get_shape_keys(obj) if obj else None
+        if shape_keys is None:
+            missing.append(obj_name)
+            continue
+
+        current_names = shapekey_names.get(shape_keys)[0]
+        if current_names == names:
+            updated = values
+        else:
+            # キーの構成が変わっている場合は名前で対応付ける
+            positions = {name: i for i, name in enumerate(names)}
+            updated = read_key_values(shape_keys)
+            for i, name in enumerate(current_names):
+                if name in positions:
+                    updated[i] = values[positions[name]]
+        write_key_values(shape_keys, updated)
+        restored += 1
+    return restored, missing
+
+
+class SnapshotBlend:
+    """Start and target values for blending the selection toward a snapshot.
+
+    The values of all objects are packed into two flat arrays so that every
+    blend step is a single lerp, written back with one foreach_set per
+    shape key datablock.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.source = None
+        self.state = None
+        self.slices = []
+        self.start = np.empty(0, dtype=np.float32)
+        self.target = np.empty(0, dtype=np.float32)
+
+    def prepare(self, objects, snapshot, source=None, state=None):
+        """Capture the current values of the objects and their target values from a snapshot.
+
+        state is the selection state (see get_selection_state) the values belong to.
+        """
+        self.reset()
+        targets = {
+            obj.as_pointer(): (names, values)
+            for obj, obj_name, names, values in resolve_snapshot(snapshot) if obj is not None
+        }
+        starts = []
+        ends = []
+        offset = 0
+        for obj, shape_keys in iter_unique_shape_keys(obj for obj in objects if obj.as_pointer() in targets):
+
+            names, values = targets[obj.as_pointer()]
+            current_names = shapekey_names.get(shape_keys)[0]
+            start = read_key_values(shape_keys)
+            if current_names == names:
+                end = np.array(values, dtype=np.float32)
+            else:
+                positions = {name: i for i, name in enumerate(names)}
+                end = start.copy()
+                for i, name in enumerate(current_names):
+                    if name in positions:
+                        end[i] = values[positions[name]]
+
+            starts.append(start)
+            ends.append(end)
+            self.slices.append((shape_keys, offset, offset + len(start)))
+            offset += len(start)
+
+        if starts:
+            self.start = np.concatenate(starts)
+            self.target = np.concatenate(ends)
+        self.source = source
+        self.state = state
+        return len(self.slices)
+
+    def validate(self, state):
+        """Forget the captured values if the selection changed."""
+        if self.source is not None and state != self.state:
+            self.reset()
+
+    def write(self, values):
+        for shape_keys, begin, end in self.slices:
+            write_key_values(shape_keys, values[begin:end])
+
+    def apply(self, factor):
+        self.write(self.start + (self.target - self.start) * np.float32(factor))
+
+    def insert_keyframes(self, factor, frame_start, frame_end):
+        """Key the start values at frame_start and the blended values at frame_end.
+
+        Only the keys whose value actually changes are keyed.
+        """
+        blended = self.start + (self.target - self.start) * np.float32(factor)
+        for shape_keys, begin, end in self.slices:
+            changed = np.flatnonzero(self.start[begin:end] != self.target[begin:end])
+            if len(changed):
+                insert_keyframes_bulk(
+                    shape_keys, changed, (frame_start, frame_end),
+                    np.stack((self.start[begin:end][changed], blended[begin:end][changed])))
+        self.write(blended)
+
+
+snapshot_blend = SnapshotBlend()
+
+
+def update_blend_factor(self, context):
+    preset = get_active_preset(context)
+    snapshot = get_active_snapshot(preset)
+    if snapshot is None:
+        return
+    # ブレンドの開始時 (または対象のスナップショットが変わったとき) の値を基準にする
+    source = (preset.name, snapshot.name)
+    if snapshot_blend.source != source:
+        cancel_pending_values()
+        snapshot_blend.prepare(get_selected_objects(context), snapshot, source, get_selection_state(context))
+    snapshot_blend.apply(self.blend_factor)
+
+
+# 遅延書き込みモードで、まだ適用していないスライダーの値 (キーごとに最後の値のみ保持する)
+pending_values = {}
+
+
+def flush_pending_values():
+    """Timer callback: apply the collected slider values in one go."""
+    if pending_values:
+        with profiler.measure("flush_pending_values") as measurement:
+            values = dict(pending_values)
+            pending_values.clear()
+            measurement.count(objects=write_values(bpy.context, values), keys=len(values))
+    # ワンショットのタイマーとして終了する
+    return None
+
+
+def defer_value(name, value, rate):
+    """Queue a slider value and make sure a flush is scheduled within 1/rate seconds."""
+    pending_values[name] = value
+    if not bpy.app.timers.is_registered(flush_pending_values):
+        bpy.app.timers.register(flush_pending_values, first_interval=1.0 / rate)
+
+
+def cancel_pending_values():
+    pending_values.clear()
+    if bpy.app.timers.is_registered(flush_pending_values):
+        bpy.app.timers.unregister(flush_pending_values)
+
+
+class LiveInput:
+    """Applies the frames of a live.Listener to the selected objects.
+
+    The listener receives on its own thread and keeps only the latest frame;
+    the timer callback takes it without waiting, so the UI thread never
+    blocks on the network.
+    """
+
+    def __init__(self):
+        self.listener = None
+        self.interval = 1.0 / 60.0
+        self.last_redraw = 0.0
+
+    @property
+    def running(self):
+        return self.listener is not None
+
+    def start(self, host, port, rate):
+        """Start listening. Raises OSError if the port cannot be bound."""
+        self.stop()
+        listener = live.Listener(host, port)
+        listener.start()
+        self.listener = listener
+        self.interval = 1.0 / rate
+        # ファイルを開いてもタイマーが解除されず、受信を続けるようにする
+        bpy.app.timers.register(consume_live_frames, first_interval=0.0, persistent=True)
+
+    def stop(self):
+        if bpy.app.timers.is_registered(consume_live_frames):
+            bpy.app.timers.unregister(consume_live_frames)
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def get_summary(self):
+        return self.listener.get_summary() if self.listener is not None else None
+
+
+live_input = LiveInput()
+
+# ライブ入力の統計表示を再描画する間隔 (秒)
+LIVE_REDRAW_INTERVAL = 1.0
+
+
+def consume_live_frames():
+    """Timer callback: write the latest live frame to the selection."""
+    listener = live_input.listener
+    if listener is None:
+        return None
+    values = listener.poll()
+    if values:
+        # スライダーの操作と同じ名前解決 (shapekey_index) で書き込む
+        with profiler.measure("live_input") as measurement:
+            measurement.count(objects=write_values(bpy.context, values), keys=len(values))
+    now = time.perf_counter()
+    if now - live_input.last_redraw >= LIVE_REDRAW_INTERVAL:
+        live_input.last_redraw = now
+        tag_redraw_properties(bpy.context)
+    return live_input.interval
+
+
+def update_deferred_mode(self, context):
+    # 遅延書き込みを無効にしたら、残っている値をすぐに適用する
+    if not self.use_deferred_update:
+        flush_pending_values()
+        cancel_pending_values()
+
+
 class TareminMultiObjectShapekeyProperty(bpy.types.PropertyGroup):
     name: bpy.props.StringProperty(name="ShapeKeyName")
+    # 一覧の更新時には選択オブジェクトの値の平均が入る
     value: bpy.props.FloatProperty(
         name="ShapeKeyValue", max=1.0, min=0.0, update=lambda self, context: self.update_selected_objects(context, self.name, self.value))
+    value_min: bpy.props.FloatProperty(
+        name="Minimum", description="Lowest value of the shape key on the selected objects")
+    value_max: bpy.props.FloatProperty(
+        name="Maximum", description="Highest value of the shape key on the selected objects")
+    mixed: bpy.props.BoolProperty(
+        name="Mixed", description="The selected objects have different values for this shape key")
 
     def update_selected_objects(self, context, name, value):
-        for obj in context.selected_objects:
-            if obj.data.shape_keys is None:
-                continue
-            index = obj.data.shape_keys.key_blocks.find(name)
-            if index == -1:
-                continue
-            block = obj.data.shape_keys.key_blocks[index]
-            block.value = value
+        # 書き込むとすべての選択オブジェクトが同じ値になる
+        self.value_min = self.value_max = value
+        self.mixed = False
+        with profiler.measure("update_selected_objects") as measurement:
+            settings = get_settings(context)
+            if settings.use_deferred_update:
+                defer_value(name, value, settings.update_rate)
+                return
+            measurement.count(objects=write_values(context, {name: value}), keys=1)
+
+
+class MOS_PresetObject(bpy.types.PropertyGroup):
+    """An object of a selection preset.
+
+    `object` is the reference that survives renames and library overrides;
+    `name` is the object's name when it was last seen, used as a fallback for
+    entries whose object was deleted or that were saved by older versions.
+    """
+    name: bpy.props.StringProperty(name="Object Name")
+    object: bpy.props.PointerProperty(name="Object", type=bpy.types.Object)
+
+
+class MOS_ValueSnapshot(bpy.types.PropertyGroup):
+    """Shape key values of a preset's objects, packed by core.pack_snapshot().
+
+    `objects` holds a reference to the object of each packed entry, in the
+    same order, so that renamed objects are still restored.
+    """
+    name: bpy.props.StringProperty(name="Snapshot Name", default="Snapshot")
+    data: bpy.props.StringProperty(name="Snapshot Data", options={'HIDDEN'})
+    objects: bpy.props.CollectionProperty(type=MOS_PresetObject, options={'HIDDEN'})
+
+
+def get_entry_key(item):
+    """Identity of a preset entry: its object pointer, or its name if it has no object."""
+    obj = item.object
+    return obj.as_pointer() if obj is not None else item.name
+
+
+def get_entry_name(item):
+    """Current name of the object of a preset entry."""
+    obj = item.object
+    return obj.name if obj is not None else item.name
+
+
+def get_object_name_map():
+    """Map object names to the objects of the file, preferring local objects over linked ones."""
+    objects = {}
+    for obj in bpy.data.objects:
+        if obj.library is None or obj.name not in objects:
+            objects[obj.name] = obj
+    return objects
+
+
+def resolve_preset_object(context, item):
+    """Get the view layer object of a preset entry, or None if it is not in the view layer."""
+    obj = item.object
+    return view_layer_objects.get(context, obj.name_full if obj is not None else item.name)
+
+
+def get_preset_objects(preset):
+    """Get the objects of a preset: by reference, or by name for entries without one."""
+    objects = []
+    name_map = None
+    for item in preset.object_names:
+        obj = item.object
+        if obj is None:
+            if name_map is None:
+                name_map = get_object_name_map()
+            obj = name_map.get(item.name)
+        if obj is not None:
+            objects.append(obj)
+    return objects
+
+
+class PresetMembership:
+    """Index from entry key (see get_entry_key) to position in the object_names of each preset.
+
+    PropertyGroups cannot hold Python attributes, so the indices are kept here
+    by preset pointer, together with the number of entries they were built
+    from, and rebuilt lazily when that number no longer matches (duplicate
+    entries of older files do not count as a mismatch). Edits through
+    MOS_SelectionPreset keep them up to date; since editing the preset
+    collection itself may move presets in memory, it must be followed by
+    clear().
+    """
+
+    def __init__(self):
+        # pointer -> (entry count, index)
+        self.indices = {}
+
+    def get(self, preset):
+        pointer = preset.as_pointer()
+        count = len(preset.object_names)
+        entry = self.indices.get(pointer)
+        if entry is None or entry[0] != count:
+            index = {}
+            for i, item in enumerate(preset.object_names):
+                index.setdefault(get_entry_key(item), i)
+            entry = self.indices[pointer] = (count, index)
+        return entry[1]
+
+    def add(self, preset, key):
+        """Record an entry appended to a preset, if its index is built."""
+        pointer = preset.as_pointer()
+        entry = self.indices.get(pointer)
+        if entry is not None:
+            count, index = entry
+            index.setdefault(key, count)
+            self.indices[pointer] = (count + 1, index)
+
+    def discard(self, preset):
+        self.indices.pop(preset.as_pointer(), None)
+
+    def clear(self):
+        self.indices.clear()
+
+
+preset_members = PresetMembership()
 
 
 class MOS_SelectionPreset(bpy.types.PropertyGroup):
     """Group of properties for a single preset."""
     name: bpy.props.StringProperty(name="Preset Name", default="Preset")
-    object_names: bpy.props.CollectionProperty(type=bpy.types.PropertyGroup)
-
-    def add_object(self, name):
+    object_names: bpy.props.CollectionProperty(type=MOS_PresetObject)
+    snapshots: bpy.props.CollectionProperty(type=MOS_ValueSnapshot)
+    active_snapshot_index: bpy.props.IntProperty()
+    active_object_index: bpy.props.IntProperty()
+
+    def add_object(self, name, obj=None):
+        """Add an entry, unless the preset already has one for the object (or the name, without an object).
+
+        Returns True if the entry was added.
+        """
+        key = obj.as_pointer() if obj is not None else name
+        if key in preset_members.get(self):
+            return False
         item = self.object_names.add()
         item.name = name
+        item.object = obj
+        preset_members.add(self, key)
+        return True
+
+    def find_object(self, obj):
+        """Get the index of the entry of an object, or -1."""
+        index = preset_members.get(self)
+        position = index.get(obj.as_pointer())
+        if position is None:
+            # 参照を持たない (名前だけの) 項目
+            position = index.get(obj.name, -1)
+        return position
+
+    def has_object(self, obj):
+        return self.find_object(obj) != -1
+
+    def add_objects(self, objects):
+        """Add the objects that are not in the preset yet. Returns the number added."""
+        added = 0
+        for obj in objects:
+            if not self.has_object(obj):
+                self.add_object(obj.name, obj)
+                added += 1
+        return added
+
+    def remove_objects(self, objects):
+        """Remove the given objects from the preset. Returns the number removed."""
+        positions = {self.find_object(obj) for obj in objects}
+        positions.discard(-1)
+        return self.remove_indices(positions)
+
+    def remove_indices(self, positions):
+        """Remove the entries at the given indices. Returns the number removed."""
+        positions = sorted(positions, reverse=True)
+        for i in positions:
+            self.object_names.remove(i)
+        if positions:
+            preset_members.discard(self)
+        self.active_object_index = min(self.active_object_index, max(0, len(self.object_names) - 1))
+        return len(positions)
+
+    def set_objects(self, objects):
+        """Make the preset hold exactly the given objects. Returns (added, removed) counts."""
+        objects = {obj.as_pointer(): obj for obj in objects}
+        removals, additions = core.plan_set_update(
+            [get_entry_key(item) for item in self.object_names], list(objects))
+        for i in removals:
+            self.object_names.remove(i)
+        if removals:
+            preset_members.discard(self)
+        for pointer in additions:
+            self.add_object(objects[pointer].name, objects[pointer])
+        self.active_object_index = min(self.active_object_index, max(0, len(self.object_names) - 1))
+        return len(additions), len(removals)
+
+
+def migrate_presets(scenes):
+    """Give the name-only preset entries of the scenes an object reference.
+
+    Entries whose object was renamed get their name updated. Returns the
+    number of entries that got a reference.
+    """
+    name_map = None
+    migrated = 0
+    preset_members.clear()
+    for scene in scenes:
+        settings = getattr(scene, "taremin_mos", None)
+        if settings is None:
+            continue
+        for preset in settings.presets:
+            for item in preset.object_names:
+                obj = item.object
+                if obj is not None:
+                    if obj.name != item.name:
+                        item.name = obj.name
+                    continue
+                if name_map is None:
+                    name_map = get_object_name_map()
+                obj = name_map.get(item.name)
+                if obj is not None:
+                    item.object = obj
+                    migrated += 1
+            # 古いファイルや、参照を付けたことで同じオブジェクトを指すようになった重複を取り除く
+            seen = set()
+            duplicates = []
+            for i, item in enumerate(preset.object_names):
+                key = get_entry_key(item)
+                if key in seen:
+                    duplicates.append(i)
+                seen.add(key)
+            preset.remove_indices(duplicates)
+    preset_members.clear()
+    return migrated
 
 
 class TareminMultiObjectShapekeyProps(bpy.types.PropertyGroup):
@@ -60,11 +1489,35 @@ class TareminMultiObjectShapekeyProps(bpy.types.PropertyGroup):
             ('UNION', 'Union', 'すべての選択オブジェクトのすべてのシェイプキー')
         )
     )
+    auto_update: bpy.props.BoolProperty(
+        name="Auto Update",
+        description="Update the shape key list automatically when the selection changes",
+        default=False
+    )
+    use_deferred_update: bpy.props.BoolProperty(
+        name="Deferred Update",
+        description="Collect slider changes and apply only the latest value per shape key at a fixed rate, so dragging stays responsive on heavy selections",
+        default=False,
+        update=update_deferred_mode
+    )
+    update_rate: bpy.props.FloatProperty(
+        name="Update Rate",
+        description="How many times per second deferred slider changes are applied (Hz)",
+        default=30.0,
+        min=1.0,
+        max=120.0
+    )
     show_selected_objects: bpy.props.BoolProperty(
         name="Show Selected Objects",
         description="Toggle visibility of selected objects list",
         default=True
     )
+    selected_objects_page: bpy.props.IntProperty(
+        name="Page",
+        description="Page of the selected objects list",
+        default=1,
+        min=1
+    )
     show_presets: bpy.props.BoolProperty(
         name="Show Presets",
         description="Toggle visibility of selection presets",
@@ -75,79 +1528,306 @@ class TareminMultiObjectShapekeyProps(bpy.types.PropertyGroup):
         description="Toggle visibility of selected preset's object list",
         default=True
     )
+    show_stats: bpy.props.BoolProperty(
+        name="Show Performance Stats",
+        description="Toggle visibility of the performance stats",
+        default=False
+    )
+    show_snapshots: bpy.props.BoolProperty(
+        name="Show Value Snapshots",
+        description="Toggle visibility of the selected preset's value snapshots",
+        default=False
+    )
+    blend_factor: bpy.props.FloatProperty(
+        name="Blend",
+        description="Blend the selected objects' shape key values from where they were when blending started toward the active snapshot",
+        default=0.0,
+        min=0.0,
+        max=1.0,
+        subtype='FACTOR',
+        update=update_blend_factor
+    )
+    show_live: bpy.props.BoolProperty(
+        name="Show Live Input",
+        description="Toggle visibility of the live network input",
+        default=False
+    )
+    live_host: bpy.props.StringProperty(
+        name="Host",
+        description="Address to receive live shape key values on (127.0.0.1 only accepts senders on this machine)",
+        default=live.DEFAULT_HOST
+    )
+    live_port: bpy.props.IntProperty(
+        name="Port",
+        description="UDP port to receive JSON or OSC frames of shape key values on",
+        default=live.DEFAULT_PORT,
+        min=1,
+        max=65535
+    )
+    live_rate: bpy.props.FloatProperty(
+        name="Apply Rate",
+        description="How many times per second the latest received frame is applied (Hz)",
+        default=60.0,
+        min=1.0,
+        max=240.0
+    )
     # Preset settings are now stored per-scene
     presets: bpy.props.CollectionProperty(type=MOS_SelectionPreset)
     active_preset_index: bpy.props.IntProperty()
 
 
+class ShapekeyListFilter:
+    """Name-derived filter and sort results of the shape key list.
+
+    Matching thousands of names on every redraw makes the list sluggish, so the
+    results are kept until the list's contents or the filter string change.
+    `version` must be bumped (touch()) whenever the list is edited.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.key = None
+        self.names = []
+        self.matches = []
+        self.name_positions = {}
+
+    def touch(self):
+        self.version += 1
+
+    def get(self, data, collection, pattern, use_regex):
+        """Get a list of bools telling which items of collection match the pattern."""
+        key = (data.as_pointer(), self.version, len(collection), pattern, use_regex)
+        if key != self.key:
+            self.key = key
+            self.names = [item.name for item in collection]
+            self.matches = core.match_names(self.names, pattern, use_regex)
+            self.name_positions = {}
+        return self.matches
+
+    def get_name_positions(self, reverse):
+        """Get the UIList sort order by name for the names of the last get() call."""
+        positions = self.name_positions.get(reverse)
+        if positions is None:
+            positions = self.name_positions[reverse] = core.sort_positions(
+                [name.casefold() for name in self.names], reverse)
+        return positions
+
+
+shapekey_list_filter = ShapekeyListFilter()
+
+
 class PROPERTIES_UL_TareminMultiObjectShapekeyList(bpy.types.UIList):
+    use_filter_regex: bpy.props.BoolProperty(
+        name="Regex",
+        description="Filter shape key names with a regular expression instead of a substring"
+    )
+    use_filter_nonzero: bpy.props.BoolProperty(
+        name="Non-zero Only",
+        description="Only show shape keys whose value is not 0.0"
+    )
+    use_filter_inactive: bpy.props.BoolProperty(
+        name="Hide Inactive",
+        description="Hide the shape keys that Find Empty Shape Keys found to move no vertex"
+    )
+    sort_by: bpy.props.EnumProperty(
+        name="Sort By",
+        items=(
+            ('INDEX', 'Order', "Keep the order of the shape keys"),
+            ('NAME', 'Name', "Sort by shape key name"),
+            ('VALUE', 'Value', "Sort by value"),
+        )
+    )
+
     def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
-        layout.label(text=item.name, icon="LINKED", translate=False)
+        # マスタープロパティに接続されたシェイプキーはマスタープロパティを直接操作する
+        if master_property_name(item.name) in context.scene:
+            layout.label(text=item.name, icon="DRIVER", translate=False)
+            layout.prop(context.scene, master_data_path(item.name), text="")
+            return
+        # 選択オブジェクト間で値が異なるキーは範囲を表示する (スライダーは平均値)
+        if item.mixed:
+            layout.label(text=item.name, icon="UNLINKED", translate=False)
+            layout.label(text=f"{item.value_min:.3f} - {item.value_max:.3f}", translate=False)
+        else:
+            layout.label(text=item.name, icon="LINKED", translate=False)
         layout.prop(item, "value", text="")
 
+    def draw_filter(self, context, layout):
+        row = layout.row(align=True)
+        row.prop(self, "filter_name", text="")
+        row.prop(self, "use_filter_regex", text=".*", toggle=True)
+        row.prop(self, "use_filter_invert", text="", icon='ARROW_LEFTRIGHT')
+        row = layout.row(align=True)
+        row.prop(self, "use_filter_nonzero", toggle=True)
+        row.prop(self, "use_filter_inactive", text="", icon='GHOST_DISABLED')
+        row.prop(self, "sort_by", expand=True)
+        row.prop(self, "use_filter_sort_reverse", text="",
+                 icon='SORT_DESC' if self.use_filter_sort_reverse else 'SORT_ASC')
+
+    @profiled("PROPERTIES_UL_TareminMultiObjectShapekeyList.filter_items")
+    def filter_items(self, context, data, propname):
+        collection = getattr(data, propname)
+        matches = shapekey_list_filter.get(data, collection, self.filter_name, self.use_filter_regex)
+        reverse = self.use_filter_sort_reverse
+
+        # 値による絞り込みと並び替えは値が変わるたびに結果が変わるので、毎回まとめて読み込む
+        values = None
+        if self.sort_by == 'VALUE':
+            array = np.empty(len(collection), dtype=np.float32)
+            collection.foreach_get("value", array)
+            values = array.tolist()
+
+        # 反転 (use_filter_invert) は Blender 側で適用される
+        bit = self.bitflag_filter_item
+        if self.use_filter_nonzero:
+            # どれかのオブジェクトで 0 以外の値を持つキーを表示する
+            minimum = np.empty(len(collection), dtype=np.float32)
+            maximum = np.empty(len(collection), dtype=np.float32)
+            collection.foreach_get("value_min", minimum)
+            collection.foreach_get("value_max", maximum)
+            nonzero = ((minimum != 0.0) | (maximum != 0.0)).tolist()
+            flags = [bit if match and value else 0 for match, value in zip(matches, nonzero)]
+        else:
+            flags = [bit if match else 0 for match in matches]
+        if self.use_filter_inactive and empty_keys.names:
+            inactive = empty_keys.names
+            flags = [0 if name in inactive else flag for flag, name in zip(flags, shapekey_list_filter.names)]
+
+        if self.sort_by == 'NAME':
+            order = shapekey_list_filter.get_name_positions(reverse)
+        elif self.sort_by == 'VALUE':
+            order = core.sort_positions(values, reverse)
+        elif reverse:
+            order = list(range(len(collection) - 1, -1, -1))
+        else:
+            order = []
+        return flags, order
+
+
+def get_shapekeys(context):
+    """Get the shape key names of the selection, filtered by the UNION / INTERSECTION setting."""
+    settings = get_settings(context)
+    return collect_shapekey_names(
+        get_selected_objects(context), settings.filter, context.view_layer.objects.active)
+
+
+def collect_shapekey_names(objects, mode, active_object=None):
+    """Get the shape key names of the given objects.
+
+    mode is 'UNION' or 'INTERSECTION'. In INTERSECTION mode the names are ordered
+    like the keys of active_object, or of the first object if it is not included.
+    """
+    with profiler.measure("get_shapekeys") as measurement:
+        names = _collect_shapekey_names(objects, mode, active_object)
+        measurement.count(objects=len(objects), keys=len(names))
+        return names
+
+
+def _collect_shapekey_names(objects, mode, active_object):
+    active_pointer = active_object.as_pointer() if active_object else 0
+
+    # 処理対象のメッシュオブジェクトをフィルタリングし、シェイプキーの名前をデータごとに取得する
+    # (リンク複製などでデータを共有しているオブジェクトは 1 回だけ処理する)
+    layouts = []
+    seen_data = set()
+    ref_layout = None
+    for obj in objects:
+        if obj.type != 'MESH' or not obj.data or not obj.data.shape_keys:
+            continue
+        shape_keys = obj.data.shape_keys
+        layout = shapekey_names.get(shape_keys)
+        if obj.as_pointer() == active_pointer:
+            ref_layout = layout
+        if shape_keys.as_pointer() not in seen_data:
+            seen_data.add(shape_keys.as_pointer())
+            layouts.append(layout)
+
+    return core.combine_names(layouts, mode, ref_layout)
+
+
+def refresh_shapekey_list(context):
+    """Bring the shape key list in line with the selection.
+
+    Only the entries that changed are removed, added or moved, then the list
+    shows the current values of the selected objects (see update_list_values).
+    Nothing is written to the objects.
+    """
+    settings = get_settings(context)
+    collection = settings.collection
+    objects = get_selected_objects(context)
+    shapekey_index.build(context, objects)
+    names = get_shapekeys(context)
+    removals, additions, moves = core.plan_list_update([item.name for item in collection], names)
+
+    # 不要になった項目を後ろから削除し、新しいシェイプキーを末尾に追加 (値は既定の 0.0) してから、
+    # 順序が違う項目だけを移動する
+    for i in removals:
+        collection.remove(i)
+    for name in additions:
+        item = collection.add()
+        item.name = name
+    for i, j in moves:
+        collection.move(i, j)
+    if removals or additions or moves:
+        shapekey_list_filter.touch()
 
-class PROPERTIES_OT_UpdateShapekeys(bpy.types.Operator):
-    bl_idname = 'taremin.mos_update'
-    bl_label = 'update'
+    # スライダーの未適用の値を反映してから読み込む
+    flush_pending_values()
+    cancel_pending_values()
+    update_list_values(collection, objects)
 
-    def execute(self, context):
-        settings = get_settings(context)
-        collection = settings.collection
-        collection.clear()
+    settings.collection_index = min(settings.collection_index, max(0, len(collection) - 1))
 
-        for name in self.get_shapekeys(context):
-            item = collection.add()
-            item.name = name
-            item.value = 0.0
 
-        return {'FINISHED'}
+def update_list_values(collection, objects):
+    """Set the values of the list items to the current values of the objects.
 
-    def get_shapekeys(self, context):
-        settings = get_settings(context)
+    The slider shows the mean; the min / max and whether the objects
+    disagree are shown next to it. foreach_set does not call the update
+    callbacks, so nothing is written back.
+    """
+    minimum, maximum, mean = read_selection_values(objects, [item.name for item in collection])
+    collection.foreach_set("value_min", minimum)
+    collection.foreach_set("value_max", maximum)
+    collection.foreach_set("mixed", (maximum > minimum).tolist())
+    collection.foreach_set("value", mean)
 
-        # 処理対象のメッシュオブジェクトをフィルタリング
-        target_objects = [
-            obj for obj in context.selected_objects
-            if obj.type == 'MESH' and obj.data and obj.data.shape_keys
-        ]
-
-        if not target_objects:
-            return []
-
-        if settings.filter == 'UNION':
-            # 和集合 (Union):
-            # 選択されたオブジェクトを順に見ていき、各オブジェクトのシェイプキーの順序を尊重しつつ、
-            # まだリストにないシェイプキーを追加していく。
-            ordered_keys = []
-            seen_keys = set()
-            for obj in target_objects:
-                for block in obj.data.shape_keys.key_blocks:
-                    if block.name not in seen_keys:
-                        ordered_keys.append(block.name)
-                        seen_keys.add(block.name)
-            return ordered_keys
-
-        elif settings.filter == 'INTERSECTION':
-            # 積集合 (Intersection):
-            # 1. 全ての対象オブジェクトに共通するシェイプキー名のセットを計算する。
-            key_sets = [
-                {block.name for block in obj.data.shape_keys.key_blocks}
-                for obj in target_objects
-            ]
-            common_key_names = set.intersection(*key_sets)
 
-            if not common_key_names:
-                return []
+# 選択変更から自動更新までの待ち時間 (秒)。連続した選択操作をまとめて 1 回の更新にする
+AUTO_REFRESH_DELAY = 0.3
 
-            # 2. 順序を決定するため、参照オブジェクト（アクティブオブジェクト or 最初のオブジェクト）を決定する。
-            ref_obj = context.active_object if context.active_object in target_objects else target_objects[0]
 
-            # 3. 参照オブジェクトのシェイプキーの順序に基づき、共通シェイプキーをリスト化する。
-            return [
-                block.name for block in ref_obj.data.shape_keys.key_blocks
-                if block.name in common_key_names
-            ]
-        raise ValueError(f'{settings.filter} is not implemented')
+def tag_redraw_properties(context):
+    for window in context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'PROPERTIES':
+                area.tag_redraw()
+
+
+def run_auto_refresh():
+    """Timer callback for the debounced automatic list refresh."""
+    context = bpy.context
+    if get_settings(context).auto_update:
+        refresh_shapekey_list(context)
+        tag_redraw_properties(context)
+    return None
+
+
+def schedule_auto_refresh():
+    # 登録済みなら登録し直して待ち時間を延長する (デバウンス)
+    if bpy.app.timers.is_registered(run_auto_refresh):
+        bpy.app.timers.unregister(run_auto_refresh)
+    bpy.app.timers.register(run_auto_refresh, first_interval=AUTO_REFRESH_DELAY)
+
+
+class PROPERTIES_OT_UpdateShapekeys(bpy.types.Operator):
+    bl_idname = 'taremin.mos_update'
+    bl_label = 'update'
+
+    @profiled("PROPERTIES_OT_UpdateShapekeys")
+    def execute(self, context):
+        refresh_shapekey_list(context)
+        return {'FINISHED'}
 
 
 class PROPERTIES_OT_ClearShapekeys(bpy.types.Operator):
@@ -157,6 +1837,7 @@ class PROPERTIES_OT_ClearShapekeys(bpy.types.Operator):
     def execute(self, context):
         settings = get_settings(context)
         settings.collection.clear()
+        shapekey_list_filter.touch()
         return {'FINISHED'}
 
 
@@ -178,14 +1859,396 @@ class PROPERTIES_OT_SetAllShapekeyValues(bpy.types.Operator):
     def description(cls, context, properties):
         return f"Set all listed shape key values to {properties.value}"
 
+    @profiled("PROPERTIES_OT_SetAllShapekeyValues")
     def execute(self, context):
         settings = get_settings(context)
-        for item in settings.collection:
-            # item.valueを更新すると、登録したupdate関数が自動で呼ばれる
-            item.value = self.value
+        collection = settings.collection
+        # 一覧のすべての値を上書きするので、未適用の遅延書き込みは不要になる
+        cancel_pending_values()
+
+        # item.value に代入すると項目ごとに update 関数が呼ばれてしまうため、
+        # シェイプキーへはまとめて書き込み、一覧の表示値は foreach_set で更新する
+        write_values_bulk(
+            get_selected_objects(context),
+            {item.name: self.value for item in collection})
+        collection.foreach_set("value", [self.value] * len(collection))
+        collection.foreach_set("value_min", [self.value] * len(collection))
+        collection.foreach_set("value_max", [self.value] * len(collection))
+        collection.foreach_set("mixed", [False] * len(collection))
         return {'FINISHED'}
 
 
+class PROPERTIES_OT_KeyframeShapekeys(bpy.types.Operator):
+    bl_idname = 'taremin.mos_keyframe'
+    bl_label = 'Insert Shape Key Keyframes'
+    bl_description = "Insert keyframes for every listed shape key on every selected object"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    mode: bpy.props.EnumProperty(
+        name="Mode",
+        items=(
+            ('CURRENT', "Current Frame", "Key the current values at the current frame"),
+            ('BAKE', "Bake Range", "Key the evaluated values on every frame of a range"),
+        ),
+        default='CURRENT'
+    )
+    frame_start: bpy.props.IntProperty(name="Start Frame")
+    frame_end: bpy.props.IntProperty(name="End Frame")
+    frame_step: bpy.props.IntProperty(name="Frame Step", default=1, min=1)
+
+    @classmethod
+    def poll(cls, context):
+        return len(get_settings(context).collection) > 0
+
+    def invoke(self, context, event):
+        self.frame_start = context.scene.frame_start
+        self.frame_end = context.scene.frame_end
+        return context.window_manager.invoke_props_dialog(self)
+
+    @profiled("PROPERTIES_OT_KeyframeShapekeys")
+    def execute(self, context):
+        settings = get_settings(context)
+        scene = context.scene
+        names = {item.name for item in settings.collection}
+        # スライダーの未適用の値も含めてキーを打つ
+        flush_pending_values()
+        cancel_pending_values()
+
+        # 一覧のシェイプキーがどのキーブロックにあたるかを、データごとに 1 度だけ求める
+        targets = []
+        for obj, shape_keys in iter_unique_shape_keys(get_selected_objects(context)):
+            layout = shapekey_names.get(shape_keys)[0]
+            indices = np.array([i for i, name in enumerate(layout) if name in names], dtype=np.intp)
+            if len(indices):
+                targets.append((shape_keys, indices))
+
+        if not targets:
+            self.report({'WARNING'}, "No listed shape keys on the selected objects")
+            return {'CANCELLED'}
+
+        if self.mode == 'CURRENT':
+            frames = [scene.frame_current]
+            samples = [[read_key_values(shape_keys)[indices]] for shape_keys, indices in targets]
+        else:
+            if self.frame_end < self.frame_start:
+                self.report({'WARNING'}, "End frame must not be before the start frame")
+                return {'CANCELLED'}
+            frames = list(range(self.frame_start, self.frame_end + 1, self.frame_step))
+            samples = [[] for _ in targets]
+            frame_current = scene.frame_current
+            for frame in frames:
+                scene.frame_set(frame)
+                for rows, (shape_keys, indices) in zip(samples, targets):
+                    rows.append(read_key_values(shape_keys)[indices])
+            scene.frame_set(frame_current)
+
+        for rows, (shape_keys, indices) in zip(samples, targets):
+            insert_keyframes_bulk(shape_keys, indices, frames, np.stack(rows))
+
+        keys = sum(len(indices) for shape_keys, indices in targets)
+        self.report({'INFO'}, f"Keyed {keys} shape key(s) on {len(frames)} frame(s)")
+        return {'FINISHED'}
+
+
+class PROPERTIES_OT_MirrorShapekeys(bpy.types.Operator):
+    bl_idname = 'taremin.mos_mirror'
+    bl_label = 'Mirror Shape Key Values'
+    bl_description = "Copy or swap the values of paired left / right shape keys (_L/_R, .L/.R, L_/R_, Left/Right) on every selected object"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    direction: bpy.props.EnumProperty(
+        name="Direction",
+        items=(
+            ('LEFT_TO_RIGHT', "Left to Right", "Copy the left side values to the right side keys"),
+            ('RIGHT_TO_LEFT', "Right to Left", "Copy the right side values to the left side keys"),
+            ('SWAP', "Swap", "Exchange the values of the left and right side keys"),
+        ),
+        default='LEFT_TO_RIGHT'
+    )
+
+    @profiled("PROPERTIES_OT_MirrorShapekeys")
+    def execute(self, context):
+        # スライダーの未適用の値を反映してから左右をコピーする
+        flush_pending_values()
+        cancel_pending_values()
+
+        pairs = 0
+        changed = 0
+        for obj, shape_keys in iter_unique_shape_keys(get_selected_objects(context)):
+            left, right = shapekey_names.get_mirror_table(shape_keys)
+            if not len(left):
+                continue
+            pairs += len(left)
+
+            # 全キーの値を 1 度に読み、ペアの対応表で一括してコピーしてから書き戻す
+            current = read_key_values(shape_keys)
+            updated = current.copy()
+            if self.direction == 'LEFT_TO_RIGHT':
+                updated[right] = current[left]
+            elif self.direction == 'RIGHT_TO_LEFT':
+                updated[left] = current[right]
+            else:
+                updated[np.concatenate((left, right))] = current[np.concatenate((right, left))]
+            if np.array_equal(updated, current):
+                continue
+            write_key_values(shape_keys, updated)
+            changed += 1
+
+        if not pairs:
+            self.report({'WARNING'}, "No paired left / right shape keys on the selected objects")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Mirrored {pairs} key pair(s), {changed} shape key datablock(s) changed")
+        return {'FINISHED'}
+
+
+class PROPERTIES_OT_NewShapeFromMix(bpy.types.Operator):
+    bl_idname = 'taremin.mos_new_shape_from_mix'
+    bl_label = 'New Shape from Mix'
+    bl_description = "Add a shape key to every selected object that bakes the mix of the listed shape key values"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    name: bpy.props.StringProperty(name="Name", default="Mix")
+
+    @classmethod
+    def poll(cls, context):
+        return len(get_settings(context).collection) > 0
+
+    @profiled("PROPERTIES_OT_NewShapeFromMix")
+    def execute(self, context):
+        settings = get_settings(context)
+        values = {item.name: item.value for item in settings.collection}
+
+        # データを共有しているオブジェクトには 1 回だけ追加する。編集モードのオブジェクトはシェイプキーを追加できない
+        # 絶対シェイプキーは値ではなく評価時間で混ぜられるので、値の合成は作れない
+        targets = []
+        skipped = 0
+        absolute = 0
+        for obj, shape_keys in iter_unique_shape_keys(get_selected_objects(context)):
+            if obj.mode == 'EDIT':
+                skipped += 1
+                continue
+            if not shape_keys.use_relative:
+                absolute += 1
+                continue
+            targets.append((obj, shape_keys))
+
+        if not targets:
+            message = "No selected objects with relative shape keys outside of edit mode"
+            if absolute:
+                message += f" ({absolute} datablock(s) use absolute shape keys)"
+            self.report({'WARNING'}, message)
+            return {'CANCELLED'}
+
+        # bpy の読み書きはメインスレッドで行い、合成の計算だけをスレッドプールで並列に実行する
+        # (読み込みの間にも先に読み込んだオブジェクトの計算が進む)
+        with ThreadPoolExecutor() as executor:
+            futures = [
+                executor.submit(compute_mix, *gather_mix(shape_keys, values))
+                for obj, shape_keys in targets
+            ]
+            for (obj, shape_keys), future in zip(targets, futures):
+                block = obj.shape_key_add(name=self.name, from_mix=False)
+                block.data.foreach_set("co", future.result())
+                shapekey_names.discard(shape_keys.as_pointer())
+                obj.data.update_tag()
+
+        # キーの構成が変わったのでインデックスを作り直す
+        shapekey_index.invalidate()
+        message = f"Added '{self.name}' to {len(targets)} shape key datablock(s)"
+        if skipped:
+            message += f", skipped {skipped} in edit mode"
+        if absolute:
+            message += f", skipped {absolute} with absolute shape keys"
+        self.report({'INFO'}, message)
+        return {'FINISHED'}
+
+
+class PROPERTIES_OT_FindEmptyShapekeys(bpy.types.Operator):
+    bl_idname = 'taremin.mos_find_empty_keys'
+    bl_label = 'Find Empty Shape Keys'
+    bl_description = "Find the shape keys that move no vertex on any selected object, and optionally mute or remove them"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    tolerance: bpy.props.FloatProperty(
+        name="Tolerance",
+        description="Largest vertex displacement that still counts as no effect",
+        default=1e-5,
+        min=0.0,
+        precision=6,
+        unit='LENGTH'
+    )
+    action: bpy.props.EnumProperty(
+        name="Action",
+        items=(
+            ('REPORT', "Report", "Only report the empty keys, which can be hidden with the list's Hide Inactive filter"),
+            ('MUTE', "Mute", "Mute the empty keys so that they are not evaluated"),
+            ('REMOVE', "Remove", "Remove the empty keys from every selected object"),
+        ),
+        default='REPORT'
+    )
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    @profiled("PROPERTIES_OT_FindEmptyShapekeys")
+    def execute(self, context):
+        # 編集モードのメッシュのシェイプキーは BMesh 側にあって key_block.data は古く、
+        # 編集中のキーの削除も安全ではないので、編集中のデータは解析にも変更にも使わない
+        selected = get_selected_objects(context)
+        editing = {
+            shape_keys.as_pointer() for shape_keys in
+            (get_shape_keys(obj) for obj in selected if obj.mode == 'EDIT') if shape_keys is not None
+        }
+        objects = []
+        skipped = 0
+        for obj in selected:
+            shape_keys = get_shape_keys(obj)
+            if shape_keys is not None and shape_keys.as_pointer() in editing:
+                skipped += 1
+                continue
+            objects.append(obj)
+        skipped_message = f" (skipped {skipped} object(s) in edit mode)" if skipped else ""
+
+        names = core.find_empty_keys(analyze_displacements(objects), self.tolerance)
+        empty_keys.set(names)
+        shapekey_list_filter.touch()
+        if not names:
+            self.report({'INFO'}, "No empty shape keys on the selected objects" + skipped_message)
+            return {'FINISHED'}
+
+        if self.action != 'REPORT':
+            name_set = set(names)
+            for obj, shape_keys in iter_unique_shape_keys(objects):
+                # 基準キーや他のキーの基準になっているキーは、このデータでは決して変更しない
+                protected = get_protected_key_names(shape_keys)
+                blocks = [block for block in shape_keys.key_blocks
+                          if block.name in name_set and block.name not in protected]
+                for block in blocks:
+                    if self.action == 'MUTE':
+                        block.mute = True
+                    else:
+                        obj.shape_key_remove(block)
+                shapekey_names.discard(shape_keys.as_pointer())
+                key_displacements.discard(shape_keys.as_pointer())
+                obj.data.update_tag()
+
+        if self.action == 'REMOVE':
+            # 削除したキーを一覧からも取り除く
+            empty_keys.clear()
+            refresh_shapekey_list(context)
+            self.report({'INFO'}, f"Removed {len(names)} empty shape key(s)" + skipped_message)
+        else:
+            verb = "Muted" if self.action == 'MUTE' else "Found"
+            self.report({'INFO'}, f"{verb} {len(names)} empty shape key(s)" + skipped_message)
+        return {'FINISHED'}
+
+
+def get_listed_targets(context, names):
+    """Get (shape key datablock, names) pairs for the listed names on the selected objects.
+
+    Objects that share their data are included only once.
+    """
+    targets = []
+    for obj, shape_keys in iter_unique_shape_keys(get_selected_objects(context)):
+        name_set = shapekey_names.get(shape_keys)[1]
+        present = [name for name in names if name in name_set]
+        if present:
+            targets.append((shape_keys, present))
+    return targets
+
+
+MASTER_SCOPE_ITEMS = (
+    ('ACTIVE', "Active", "Only the active shape key of the list"),
+    ('ALL', "All Listed", "Every shape key in the list"),
+)
+
+
+def get_scope_names(settings, scope):
+    if scope == 'ALL':
+        return [item.name for item in settings.collection]
+    if 0 <= settings.collection_index < len(settings.collection):
+        return [settings.collection[settings.collection_index].name]
+    return []
+
+
+class PROPERTIES_OT_BindMaster(bpy.types.Operator):
+    bl_idname = 'taremin.mos_bind_master'
+    bl_label = 'Bind to Master Property'
+    bl_description = "Drive the shape key on every selected object from one scene property, so the value also propagates during playback and rendering without Python"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    scope: bpy.props.EnumProperty(name="Scope", items=MASTER_SCOPE_ITEMS, default='ACTIVE')
+
+    @classmethod
+    def poll(cls, context):
+        return len(get_settings(context).collection) > 0
+
+    @profiled("PROPERTIES_OT_BindMaster")
+    def execute(self, context):
+        settings = get_settings(context)
+        scene = context.scene
+        names = get_scope_names(settings, self.scope)
+        flush_pending_values()
+        cancel_pending_values()
+
+        targets = get_listed_targets(context, names)
+        if not targets:
+            self.report({'WARNING'}, "No listed shape keys on the selected objects")
+            return {'CANCELLED'}
+
+        values = {item.name: item.value for item in settings.collection}
+        for name in names:
+            ensure_master_property(scene, name, values.get(name, 0.0))
+        drivers = 0
+        for shape_keys, present in targets:
+            bind_to_master(shape_keys, present, scene)
+            drivers += len(present)
+
+        self.report({'INFO'}, f"Bound {drivers} shape key(s) to {len(names)} master property(s)")
+        return {'FINISHED'}
+
+
+class PROPERTIES_OT_UnbindMaster(bpy.types.Operator):
+    bl_idname = 'taremin.mos_unbind_master'
+    bl_label = 'Unbind from Master Property'
+    bl_description = "Remove the master property drivers of the shape keys on the selected objects"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    scope: bpy.props.EnumProperty(name="Scope", items=MASTER_SCOPE_ITEMS, default='ALL')
+    bake: bpy.props.BoolProperty(
+        name="Bake",
+        description="Keep the current value of the master property as the static shape key value",
+        default=True
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return len(get_settings(context).collection) > 0
+
+    @profiled("PROPERTIES_OT_UnbindMaster")
+    def execute(self, context):
+        settings = get_settings(context)
+        scene = context.scene
+        names = get_scope_names(settings, self.scope)
+
+        removed = 0
+        for shape_keys, present in get_listed_targets(context, names):
+            removed += unbind_from_master(shape_keys, present, self.bake)
+
+        # どのドライバーからも参照されなくなったマスタープロパティを削除する
+        used = get_used_master_properties()
+        deleted = 0
+        for name in names:
+            prop = master_property_name(name)
+            if prop in scene and (scene.as_pointer(), prop) not in used:
+                del scene[prop]
+                deleted += 1
+
+        self.report({'INFO'}, f"Removed {removed} master driver(s) and {deleted} master property(ies)")
+        # ドライバーがなくても孤立したマスタープロパティを削除したなら、Undo できるように FINISHED を返す
+        return {'FINISHED'} if removed or deleted else {'CANCELLED'}
+
+
 class MOS_UL_PresetList(bpy.types.UIList):
     """UIList for selection presets."""
 
@@ -195,6 +2258,19 @@ class MOS_UL_PresetList(bpy.types.UIList):
             layout.prop(item, "name", text="", emboss=False, icon='OBJECT_DATA')
 
 
+class MOS_UL_PresetObjectList(bpy.types.UIList):
+    """UIList for the objects of a selection preset."""
+
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        if self.layout_type in {'DEFAULT', 'COMPACT'}:
+            row = layout.row(align=True)
+            # 参照を持たない (オブジェクトが見つからない) 項目は名前を薄く表示する
+            row.active = item.object is not None
+            row.label(text=get_entry_name(item), icon='OBJECT_DATAMODE', translate=False)
+            op = row.operator(MOS_OT_RemoveObjectFromPreset.bl_idname, text="", icon='X', emboss=False)
+            op.index = index
+
+
 class MOS_OT_AddPreset(bpy.types.Operator):
     """Save the current selection as a new preset."""
     bl_idname = "taremin.mos_preset_add"
@@ -211,10 +2287,11 @@ class MOS_OT_AddPreset(bpy.types.Operator):
     def invoke(self, context, event):
         return context.window_manager.invoke_props_dialog(self)
 
+    @profiled("MOS_OT_AddPreset")
     def execute(self, context):
         settings = get_settings(context)
         selected_objs = [
-            obj.name for obj in context.selected_objects if obj.type == 'MESH']
+            obj for obj in context.selected_objects if obj.type == 'MESH']
 
         if not selected_objs:
             self.report({'WARNING'}, "No mesh objects selected to save")
@@ -225,9 +2302,10 @@ class MOS_OT_AddPreset(bpy.types.Operator):
             return {'CANCELLED'}
 
         new_preset = settings.presets.add()
+        preset_members.clear()
         new_preset.name = self.preset_name
-        for obj_name in selected_objs:
-            new_preset.add_object(obj_name)
+        for obj in selected_objs:
+            new_preset.add_object(obj.name, obj)
 
         settings.active_preset_index = len(settings.presets) - 1
         return {'FINISHED'}
@@ -245,10 +2323,12 @@ class MOS_OT_RemovePreset(bpy.types.Operator):
         settings = get_settings(context)
         return settings.presets
 
+    @profiled("MOS_OT_RemovePreset")
     def execute(self, context):
         settings = get_settings(context)
         index = settings.active_preset_index
         settings.presets.remove(index)
+        preset_members.clear()
         settings.active_preset_index = min(
             max(0, index - 1), len(settings.presets) - 1)
         return {'FINISHED'}
@@ -274,27 +2354,47 @@ class MOS_OT_LoadPreset(bpy.types.Operator):
         settings = get_settings(context)
         return settings.presets
 
+    refresh_list: bpy.props.BoolProperty(
+        name="Update List",
+        description="Update the shape key list for the new selection right away",
+        default=False
+    )
+
+    @profiled("MOS_OT_LoadPreset")
     def execute(self, context):
         settings = get_settings(context)
         if not settings.presets or settings.active_preset_index >= len(settings.presets):
             return {'CANCELLED'}
 
         preset = settings.presets[settings.active_preset_index]
-        object_names = [obj.name for obj in preset.object_names]
-
+        targets = []
+        missing = []
+        for item in preset.object_names:
+            obj = resolve_preset_object(context, item)
+            if obj is None:
+                missing.append(get_entry_name(item))
+            else:
+                targets.append(obj)
+
+        # 選択解除は選択中のオブジェクトのうち、プリセットに含まれないものだけに行う
+        # (bpy.ops.object.select_all はアンドゥの登録や再描画を伴うので使わない)
         if self.mode == 'REPLACE':
-            bpy.ops.object.select_all(action='DESELECT')
-
-        first_valid_obj = None
-        for name in object_names:
-            obj = bpy.data.objects.get(name)
-            if obj:
+            target_pointers = {obj.as_pointer() for obj in targets}
+            for obj in context.view_layer.objects.selected:
+                if obj.as_pointer() not in target_pointers:
+                    obj.select_set(False)
+        for obj in targets:
+            if not obj.select_get():
                 obj.select_set(True)
-                if not first_valid_obj:
-                    first_valid_obj = obj
 
-        if first_valid_obj:
-            context.view_layer.objects.active = first_valid_obj
+        if targets:
+            context.view_layer.objects.active = targets[0]
+        if missing:
+            self.report(
+                {'WARNING'}, f"{len(missing)} object(s) of preset '{preset.name}' not found in the view layer: "
+                + ", ".join(missing[:5]) + (", ..." if len(missing) > 5 else ""))
+        if self.refresh_list:
+            refresh_shapekey_list(context)
 
         return {'FINISHED'}
 
@@ -317,6 +2417,7 @@ class MOS_OT_MovePreset(bpy.types.Operator):
         settings = get_settings(context)
         return settings.presets and 0 <= settings.active_preset_index < len(settings.presets)
 
+    @profiled("MOS_OT_MovePreset")
     def execute(self, context):
         settings = get_settings(context)
         index = settings.active_preset_index
@@ -327,6 +2428,7 @@ class MOS_OT_MovePreset(bpy.types.Operator):
         elif self.direction == 'DOWN' and index < len(settings.presets) - 1:
             settings.presets.move(index, index + 1)
             settings.active_preset_index += 1
+        preset_members.clear()
         return {'FINISHED'}
 
 
@@ -338,19 +2440,23 @@ class MOS_OT_RemoveObjectFromPreset(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
 
     object_name: bpy.props.StringProperty()
+    index: bpy.props.IntProperty(default=-1)
 
     @classmethod
     def poll(cls, context):
         settings = get_settings(context)
         return settings.presets and 0 <= settings.active_preset_index < len(settings.presets)
 
+    @profiled("MOS_OT_RemoveObjectFromPreset")
     def execute(self, context):
         settings = get_settings(context)
         preset = settings.presets[settings.active_preset_index]
-        for i, obj in enumerate(preset.object_names):
-            if obj.name == self.object_name:
-                preset.object_names.remove(i)
-                return {'FINISHED'}
+        if 0 <= self.index < len(preset.object_names):
+            preset.remove_indices([self.index])
+            return {'FINISHED'}
+        positions = [i for i, item in enumerate(preset.object_names) if get_entry_name(item) == self.object_name]
+        if preset.remove_indices(positions[:1]):
+            return {'FINISHED'}
 
         return {'CANCELLED'}
 
@@ -368,15 +2474,13 @@ class MOS_OT_AddSelectedToPreset(bpy.types.Operator):
         # Can run if there are selected objects and an active preset
         return context.selected_objects and settings.presets and 0 <= settings.active_preset_index < len(settings.presets)
 
+    @profiled("MOS_OT_AddSelectedToPreset")
     def execute(self, context):
         settings = get_settings(context)
         preset = settings.presets[settings.active_preset_index]
 
-        added_count = 0
-        for obj in context.selected_objects:
-            if obj.type == 'MESH' and obj.name not in [o.name for o in preset.object_names]:
-                preset.add_object(obj.name)
-                added_count +=1
+        added_count = preset.add_objects(
+            obj for obj in context.selected_objects if obj.type == 'MESH')
 
         if added_count > 0:
             self.report(
@@ -390,52 +2494,291 @@ class MOS_OT_AddSelectedToPreset(bpy.types.Operator):
             return {'CANCELLED'}
 
 
+class MOS_OT_RemoveSelectedFromPreset(bpy.types.Operator):
+    """Remove currently selected objects from the active preset."""
+    bl_idname = "taremin.mos_preset_remove_selected"
+    bl_label = "Remove Selected from Preset"
+    bl_description = "Remove all currently selected objects from the active preset"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.selected_objects and get_active_preset(context) is not None
+
+    @profiled("MOS_OT_RemoveSelectedFromPreset")
+    def execute(self, context):
+        preset = get_active_preset(context)
+        removed_count = preset.remove_objects(context.selected_objects)
+        self.report({'INFO'}, f"Removed {removed_count} object(s) from preset '{preset.name}'")
+        return {'FINISHED'}
+
+
+class MOS_OT_SyncPresetToSelection(bpy.types.Operator):
+    """Make the active preset hold exactly the selected objects."""
+    bl_idname = "taremin.mos_preset_sync_selection"
+    bl_label = "Sync Preset to Selection"
+    bl_description = "Replace the contents of the active preset with the currently selected mesh objects"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return get_active_preset(context) is not None
+
+    @profiled("MOS_OT_SyncPresetToSelection")
+    def execute(self, context):
+        preset = get_active_preset(context)
+        added_count, removed_count = preset.set_objects(
+            [obj for obj in context.selected_objects if obj.type == 'MESH'])
+        self.report(
+            {'INFO'}, f"Preset '{preset.name}': added {added_count}, removed {removed_count} object(s)")
+        return {'FINISHED'}
+
+
+class MOS_OT_MigratePresets(bpy.types.Operator):
+    """Give name-only preset entries a reference to their object."""
+    bl_idname = "taremin.mos_preset_migrate"
+    bl_label = "Update Preset References"
+    bl_description = "Link preset entries that only store an object name (from older versions or imports) to the object of that name, and refresh the stored names of renamed objects"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @profiled("MOS_OT_MigratePresets")
+    def execute(self, context):
+        migrated = migrate_presets(bpy.data.scenes)
+        self.report({'INFO'}, f"Linked {migrated} preset entries to their objects")
+        return {'FINISHED'}
+
+
+def get_active_preset(context):
+    """Get the active selection preset, or None."""
+    settings = get_settings(context)
+    if 0 <= settings.active_preset_index < len(settings.presets):
+        return settings.presets[settings.active_preset_index]
+    return None
+
+
+def get_active_snapshot(preset):
+    """Get the active value snapshot of a preset, or None."""
+    if preset is not None and 0 <= preset.active_snapshot_index < len(preset.snapshots):
+        return preset.snapshots[preset.active_snapshot_index]
+    return None
+
+
+class MOS_UL_SnapshotList(bpy.types.UIList):
+    """UIList for the value snapshots of a preset."""
+
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        if self.layout_type in {'DEFAULT', 'COMPACT'}:
+            layout.prop(item, "name", text="", emboss=False, icon='SHAPEKEY_DATA')
+
+
+class MOS_OT_CaptureValueSnapshot(bpy.types.Operator):
+    """Save the shape key values of the active preset's objects."""
+    bl_idname = "taremin.mos_snapshot_capture"
+    bl_label = "Capture Value Snapshot"
+    bl_description = "Save every shape key value of the active preset's objects as a snapshot"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    snapshot_name: bpy.props.StringProperty(
+        name="Snapshot Name",
+        description="Name for the new snapshot",
+        default="Snapshot"
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return get_active_preset(context) is not None
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    @profiled("MOS_OT_CaptureValueSnapshot")
+    def execute(self, context):
+        preset = get_active_preset(context)
+        data, captured = capture_snapshot(get_preset_objects(preset))
+        if not captured:
+            self.report({'WARNING'}, "No objects with shape keys in the preset")
+            return {'CANCELLED'}
+
+        snapshot_blend.reset()
+        snapshot = preset.snapshots.add()
+        snapshot.name = self.snapshot_name
+        snapshot.data = data
+        # 名前が変わっても復元できるように、各エントリーのオブジェクトへの参照を保存する
+        for obj in captured:
+            reference = snapshot.objects.add()
+            reference.name = obj.name
+            reference.object = obj
+        preset.active_snapshot_index = len(preset.snapshots) - 1
+        self.report({'INFO'}, f"Captured shape key values of {len(captured)} object(s)")
+        return {'FINISHED'}
+
+
+class MOS_OT_RestoreValueSnapshot(bpy.types.Operator):
+    """Restore the shape key values of the active snapshot."""
+    bl_idname = "taremin.mos_snapshot_restore"
+    bl_label = "Restore Value Snapshot"
+    bl_description = "Write the shape key values of the active snapshot back to its objects"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return get_active_snapshot(get_active_preset(context)) is not None
+
+    @profiled("MOS_OT_RestoreValueSnapshot")
+    def execute(self, context):
+        preset = get_active_preset(context)
+        snapshot = get_active_snapshot(preset)
+        # 未適用のスライダーの値で復元した値が上書きされないようにする
+        cancel_pending_values()
+        snapshot_blend.reset()
+        try:
+            restored, missing = restore_snapshot(snapshot)
+        except Exception as e:
+            self.report({'ERROR'}, f"Failed to read snapshot '{snapshot.name}': {e}")
+            return {'CANCELLED'}
+
+        if missing:
+            self.report({'WARNING'}, f"Restored {restored} object(s), {len(missing)} not found: {', '.join(missing[:10])}")
+        else:
+            self.report({'INFO'}, f"Restored {restored} object(s)")
+        return {'FINISHED'}
+
+
+class MOS_OT_BlendValueSnapshot(bpy.types.Operator):
+    """Blend the selection's shape key values toward the active snapshot."""
+    bl_idname = "taremin.mos_snapshot_blend"
+    bl_label = "Blend Toward Snapshot"
+    bl_description = "Interpolate the selected objects' shape key values from their current values toward the active snapshot"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    factor: bpy.props.FloatProperty(
+        name="Factor",
+        description="0.0 keeps the current values, 1.0 restores the snapshot",
+        default=1.0,
+        min=0.0,
+        max=1.0,
+        subtype='FACTOR'
+    )
+    keyframe: bpy.props.BoolProperty(
+        name="Keyframe",
+        description="Key the current values at the start frame and the blended values at the end frame",
+        default=False
+    )
+    frame_start: bpy.props.IntProperty(name="Start Frame")
+    frame_end: bpy.props.IntProperty(name="End Frame")
+
+    @classmethod
+    def poll(cls, context):
+        return get_active_snapshot(get_active_preset(context)) is not None
+
+    def invoke(self, context, event):
+        self.frame_start = context.scene.frame_current
+        self.frame_end = context.scene.frame_current + context.scene.render.fps
+        return context.window_manager.invoke_props_dialog(self)
+
+    @profiled("MOS_OT_BlendValueSnapshot")
+    def execute(self, context):
+        snapshot = get_active_snapshot(get_active_preset(context))
+        cancel_pending_values()
+        snapshot_blend.reset()
+
+        blend = SnapshotBlend()
+        try:
+            count = blend.prepare(get_selected_objects(context), snapshot)
+        except Exception as e:
+            self.report({'ERROR'}, f"Failed to read snapshot '{snapshot.name}': {e}")
+            return {'CANCELLED'}
+        if count == 0:
+            self.report({'WARNING'}, f"No selected object is stored in snapshot '{snapshot.name}'")
+            return {'CANCELLED'}
+
+        if self.keyframe:
+            if self.frame_end <= self.frame_start:
+                self.report({'WARNING'}, "End frame must be after the start frame")
+                return {'CANCELLED'}
+            blend.insert_keyframes(self.factor, self.frame_start, self.frame_end)
+        else:
+            blend.apply(self.factor)
+        return {'FINISHED'}
+
+
+class MOS_OT_RemoveValueSnapshot(bpy.types.Operator):
+    """Remove the active value snapshot."""
+    bl_idname = "taremin.mos_snapshot_remove"
+    bl_label = "Remove Value Snapshot"
+    bl_description = "Remove the active value snapshot"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return get_active_snapshot(get_active_preset(context)) is not None
+
+    def execute(self, context):
+        preset = get_active_preset(context)
+        index = preset.active_snapshot_index
+        snapshot_blend.reset()
+        preset.snapshots.remove(index)
+        preset.active_snapshot_index = min(max(0, index - 1), len(preset.snapshots) - 1)
+        return {'FINISHED'}
+
+
 class MOS_OT_ExportPresets(bpy.types.Operator, ExportHelper):
-    """Export selection presets to a JSON file."""
+    """Export selection presets to a JSON Lines file."""
     bl_idname = "taremin.mos_preset_export"
     bl_label = "Export Presets"
-    bl_description = "Export all selection presets to a JSON file"
+    bl_description = "Export all selection presets to a JSON Lines file (one preset per line)"
     bl_options = {'REGISTER'}
 
-    filename_ext = ".json"
+    filename_ext = ".jsonl"
     filter_glob: bpy.props.StringProperty(
-        default="*.json",
+        default="*.jsonl;*.jsonl.gz;*.json",
         options={'HIDDEN'},
         maxlen=255,
     )
 
+    compress: bpy.props.BoolProperty(
+        name="Compress",
+        description="Write a gzip-compressed file (.jsonl.gz)",
+        default=False
+    )
+
+    @profiled("MOS_OT_ExportPresets")
     def execute(self, context):
         settings = get_settings(context)
-
-        presets_data = []
-        for preset in settings.presets:
-            presets_data.append({
-                "name": preset.name,
-                "object_names": [obj.name for obj in preset.object_names],
-            })
-
+        filepath = self.filepath
+        if self.compress and not filepath.lower().endswith(".gz"):
+            filepath += ".gz"
+
+        # プリセットは 1 件ずつ書き出し、ファイル全体をメモリ上に組み立てない
+        presets = (
+            (
+                preset.name,
+                [get_entry_name(item) for item in preset.object_names],
+                [(snapshot.name, get_snapshot_data(snapshot)) for snapshot in preset.snapshots],
+            )
+            for preset in settings.presets
+        )
         try:
-            with open(self.filepath, 'w', encoding='utf-8') as f:
-                json.dump(presets_data, f, ensure_ascii=False, indent=2)
+            count = core.write_presets(filepath, presets, self.compress)
         except Exception as e:
             self.report({'ERROR'}, f"Failed to write file: {e}")
             return {'CANCELLED'}
 
         self.report(
-            {'INFO'}, f"Exported {len(presets_data)} presets to {self.filepath}")
+            {'INFO'}, f"Exported {count} presets to {filepath}")
         return {'FINISHED'}
 
 
 class MOS_OT_ImportPresets(bpy.types.Operator, ImportHelper):
-    """Import selection presets from a JSON file."""
+    """Import selection presets from a JSON Lines or JSON file."""
     bl_idname = "taremin.mos_preset_import"
     bl_label = "Import Presets"
-    bl_description = "Import selection presets from a JSON file"
+    bl_description = "Import selection presets from a JSON Lines file (optionally gzip-compressed) or a JSON file of older versions"
     bl_options = {'REGISTER', 'UNDO'}
 
-    filename_ext = ".json"
+    filename_ext = ".jsonl"
     filter_glob: bpy.props.StringProperty(
-        default="*.json",
+        default="*.jsonl;*.jsonl.gz;*.json;*.gz",
         options={'HIDDEN'},
         maxlen=255,
     )
@@ -445,15 +2788,31 @@ class MOS_OT_ImportPresets(bpy.types.Operator, ImportHelper):
         description="If enabled, all existing presets will be removed before importing",
         default=False
     )
+    merge: bpy.props.EnumProperty(
+        name="Merge",
+        description="What to do with imported presets whose name is already used",
+        items=(
+            ('SKIP', "Skip", "Keep the existing preset and skip the imported one"),
+            ('OVERWRITE', "Overwrite", "Replace the contents of the existing preset"),
+            ('RENAME', "Rename", "Import the preset under a new name"),
+        ),
+        default='SKIP'
+    )
 
+    @profiled("MOS_OT_ImportPresets")
     def execute(self, context):
         settings = get_settings(context)
 
+        # ファイル全体を読み込んで検証し終えるまで既存のプリセットには触れない
+        # (読み込みに失敗したときに上書きで全てのプリセットが消えないようにする)
+        errors = []
+        window_manager = context.window_manager
+        window_manager.progress_begin(0, 100)
         try:
-            # Use 'utf-8-sig' to correctly handle UTF-8 files with or without a BOM (Byte Order Mark),
-            # which some text editors (like Windows Notepad) add automatically.
-            with open(self.filepath, 'r', encoding='utf-8-sig') as f:
-                presets_data = json.load(f)
+            presets = []
+            for progress, preset_data in core.read_presets(self.filepath, errors):
+                window_manager.progress_update(int(progress * 100))
+                presets.append(preset_data)
         except UnicodeDecodeError:
             self.report({'ERROR'}, "File is not valid UTF-8. Please save the file with UTF-8 encoding.")
             return {'CANCELLED'}
@@ -463,45 +2822,231 @@ class MOS_OT_ImportPresets(bpy.types.Operator, ImportHelper):
         except Exception as e:
             self.report({'ERROR'}, f"Failed to read or parse file: {e}")
             return {'CANCELLED'}
-
-        if not isinstance(presets_data, list):
-            self.report(
-                {'ERROR'}, "JSON file is not a valid preset list (must be a JSON array).")
-            return {'CANCELLED'}
+        finally:
+            window_manager.progress_end()
 
         if self.overwrite:
             settings.presets.clear()
+        # プリセットの追加で既存のプリセットのメモリ上の位置が変わることがある
+        preset_members.clear()
 
-        existing_names = {p.name for p in settings.presets}
+        existing = {p.name: i for i, p in enumerate(settings.presets)}
+        name_map = get_object_name_map()
         imported_count = 0
-        for preset_data in presets_data:            
-            name = preset_data.get("name")
-            obj_names = preset_data.get("object_names")
-
-            if not name or not isinstance(obj_names, list):
-                self.report(
-                    {'WARNING'}, f"Skipping invalid preset data: {preset_data}")
-                continue
-
-            if name not in existing_names:
-                new_preset = settings.presets.add()
-                new_preset.name = name
+        skipped_count = 0
+        try:
+            for name, obj_names, snapshots in presets:
+                if name in existing:
+                    if self.merge == 'SKIP':
+                        skipped_count += 1
+                        continue
+                    if self.merge == 'RENAME':
+                        name = core.unique_name(name, existing)
+
+                index = existing.get(name)
+                if index is None:
+                    preset = settings.presets.add()
+                    preset_members.clear()
+                    preset.name = name
+                    existing[name] = len(settings.presets) - 1
+                else:
+                    preset = settings.presets[index]
+                    preset.object_names.clear()
+                    preset_members.discard(preset)
+                    preset.snapshots.clear()
+                    preset.active_object_index = 0
+                    preset.active_snapshot_index = 0
                 for obj_name in obj_names:
-                    new_preset.add_object(obj_name)
-                existing_names.add(name)
+                    preset.add_object(obj_name, name_map.get(obj_name))
+                for snapshot_name, snapshot_data in snapshots:
+                    snapshot = preset.snapshots.add()
+                    snapshot.name = snapshot_name
+                    snapshot.data = snapshot_data
                 imported_count += 1
+        finally:
+            preset_members.clear()
 
-        self.report({'INFO'}, f"Imported {imported_count} presets.")
+        if errors:
+            self.report(
+                {'WARNING'}, f"Skipped {len(errors)} invalid presets: "
+                + "; ".join(f"#{position}: {message}" for position, message in errors[:3])
+                + ("; ..." if len(errors) > 3 else ""))
+        self.report(
+            {'INFO'}, f"Imported {imported_count} presets"
+            + (f", skipped {skipped_count} existing" if skipped_count else "") + ".")
+        return {'FINISHED'}
+
+
+# カタログの確認結果のポップアップに表示する名前の最大数
+CATALOG_REPORT_LIMIT = 10
+
+
+class MOS_OT_CheckCatalogCoverage(bpy.types.Operator):
+    """Look up the listed shape keys and the active preset's objects in a shape key catalog."""
+    bl_idname = "taremin.mos_catalog_coverage"
+    bl_label = "Check Catalog Coverage"
+    bl_description = "Show how many cataloged files and objects (see catalog.py) have the listed shape keys and the active preset's objects"
+    bl_options = {'REGISTER'}
+
+    filepath: bpy.props.StringProperty(name="Catalog", subtype='FILE_PATH')
+
+    def invoke(self, context, event):
+        preferences = get_preferences(context)
+        if not self.filepath and preferences is not None:
+            self.filepath = preferences.catalog_path
+        return self.execute(context)
+
+    @profiled("MOS_OT_CheckCatalogCoverage")
+    def execute(self, context):
+        filepath = bpy.path.abspath(self.filepath)
+        if not filepath or not Path(filepath).is_file():
+            self.report({'ERROR'}, "Set the shape key catalog file in the addon preferences")
+            return {'CANCELLED'}
+
+        # sqlite3 はカタログを使うときだけ読み込む
+        from . import catalog
+
+        names = [item.name for item in get_settings(context).collection]
+        preset = get_active_preset(context)
+        object_names = [get_entry_name(item) for item in preset.object_names] if preset else []
+        try:
+            with catalog.Catalog(filepath) as db:
+                file_count, object_count = db.get_counts()
+                coverage = db.key_coverage(names)
+                object_files = db.object_files(object_names)
+        except Exception as e:
+            self.report({'ERROR'}, f"Failed to read the catalog: {e}")
+            return {'CANCELLED'}
+
+        def join(items):
+            return ", ".join(items[:CATALOG_REPORT_LIMIT]) + (", ..." if len(items) > CATALOG_REPORT_LIMIT else "")
+
+        lines = [f"{file_count} files, {object_count} objects in the catalog"]
+        missing_keys = [name for name in names if coverage.get(name, (0, 0))[0] == 0]
+        lines.append(f"Listed shape keys: {len(names) - len(missing_keys)} / {len(names)} found")
+        if missing_keys:
+            lines.append("  Not found: " + join(missing_keys))
+        # 見つかったシェイプキーのうち、含むファイルが少ないものから表示する
+        rare = sorted((coverage[name][1], name) for name in set(names).difference(missing_keys))
+        for files, name in rare[:CATALOG_REPORT_LIMIT]:
+            lines.append(f"  {name}: {coverage[name][0]} objects in {files} files")
+        if preset is not None:
+            missing_objects = [name for name in object_names if name not in object_files]
+            lines.append(f"Preset '{preset.name}': {len(object_names) - len(missing_objects)} / {len(object_names)} objects found")
+            if missing_objects:
+                lines.append("  Not found: " + join(missing_objects))
+
+        def draw(menu, context):
+            for line in lines:
+                menu.layout.label(text=line, translate=False)
+
+        context.window_manager.popup_menu(draw, title="Catalog Coverage", icon='VIEWZOOM')
+        self.report({'INFO'}, lines[1])
+        return {'FINISHED'}
+
+
+class MOS_OT_ExportStats(bpy.types.Operator, ExportHelper):
+    """Export the recorded performance stats."""
+    bl_idname = "taremin.mos_stats_export"
+    bl_label = "Export Performance Stats"
+    bl_description = "Export the recorded performance stats to a JSON or CSV file"
+    bl_options = {'REGISTER'}
+
+    filename_ext = ".json"
+    filter_glob: bpy.props.StringProperty(
+        default="*.json;*.csv",
+        options={'HIDDEN'},
+        maxlen=255,
+    )
+
+    def execute(self, context):
+        try:
+            profiler.dump(self.filepath)
+        except Exception as e:
+            self.report({'ERROR'}, f"Failed to write file: {e}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Exported {len(profiler.records)} records to {self.filepath}")
+        return {'FINISHED'}
+
+
+class MOS_OT_StartLiveInput(bpy.types.Operator):
+    bl_idname = "taremin.mos_live_start"
+    bl_label = "Start Live Input"
+    bl_description = "Receive shape key values over UDP and apply them to the selected objects"
+    bl_options = {'REGISTER'}
+
+    @classmethod
+    def poll(cls, context):
+        return not live_input.running
+
+    def execute(self, context):
+        settings = get_settings(context)
+        try:
+            live_input.start(settings.live_host, settings.live_port, settings.live_rate)
+        except OSError as e:
+            self.report({'ERROR'}, f"Cannot listen on {settings.live_host}:{settings.live_port}: {e}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Listening on {settings.live_host}:{live_input.listener.port}")
+        return {'FINISHED'}
+
+
+class MOS_OT_StopLiveInput(bpy.types.Operator):
+    bl_idname = "taremin.mos_live_stop"
+    bl_label = "Stop Live Input"
+    bl_description = "Stop receiving live shape key values"
+    bl_options = {'REGISTER'}
+
+    @classmethod
+    def poll(cls, context):
+        return live_input.running
+
+    def execute(self, context):
+        live_input.stop()
+        return {'FINISHED'}
+
+
+class MOS_OT_ResetStats(bpy.types.Operator):
+    """Clear the recorded performance stats."""
+    bl_idname = "taremin.mos_stats_reset"
+    bl_label = "Reset Performance Stats"
+    bl_description = "Clear the recorded performance stats"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        profiler.reset()
         return {'FINISHED'}
 
 
 class MultiObjectShapekeyAddonPreferences(bpy.types.AddonPreferences):
     bl_idname = __name__
 
+    enable_profiling: bpy.props.BoolProperty(
+        name="Enable Profiling",
+        description="Record call counts and timings of the addon's callbacks and operators",
+        default=False,
+        update=update_profiling
+    )
+    profile_capacity: bpy.props.IntProperty(
+        name="Max Records",
+        description="Number of most recent calls kept for export",
+        default=1000,
+        min=10,
+        max=1000000,
+        update=update_profiling
+    )
+    catalog_path: bpy.props.StringProperty(
+        name="Shape Key Catalog",
+        description="SQLite catalog made by catalog.py, used by Check Catalog Coverage",
+        subtype='FILE_PATH'
+    )
+
     def draw(self, context):
         layout = self.layout
-        layout.label(text="This addon has no user preferences.")
         layout.label(text="All settings and presets are stored within the .blend file.")
+        row = layout.row()
+        row.prop(self, "enable_profiling")
+        row.prop(self, "profile_capacity")
+        layout.prop(self, "catalog_path")
 
 
 class PROPERTIES_PT_TareminPanel(bpy.types.Panel):
@@ -517,6 +3062,7 @@ class PROPERTIES_PT_TareminPanel(bpy.types.Panel):
             (context.object.type == 'MESH')
         )
 
+    @profiled("PROPERTIES_PT_TareminPanel.draw")
     def draw(self, context):
         settings = get_settings(context)
         layout = self.layout
@@ -526,19 +3072,36 @@ class PROPERTIES_PT_TareminPanel(bpy.types.Panel):
         row = box.row()
         row.prop(settings, "show_selected_objects", text="Selected Objects", toggle=True, icon="TRIA_DOWN" if settings.show_selected_objects else "TRIA_RIGHT")
         if settings.show_selected_objects:
-            for obj in context.selected_objects:
-                obj_row = box.row()
-                obj_row.label(text=obj.name, translate=False)
+            # 描画するのは 1 ページ分だけにして、選択数が増えても描画の負荷が変わらないようにする
+            names = selection_names.get(context)
+            pages = max(1, -(-len(names) // SELECTED_OBJECTS_PER_PAGE))
+            page = min(settings.selected_objects_page, pages)
+            start = (page - 1) * SELECTED_OBJECTS_PER_PAGE
+            col = box.column(align=True)
+            for name in names[start:start + SELECTED_OBJECTS_PER_PAGE]:
+                col.label(text=name, translate=False)
+            if pages > 1:
+                row = box.row(align=True)
+                row.prop(settings, "selected_objects_page")
+                row.label(text=f"/ {pages} ({len(names)} objects)", translate=False)
 
         row = layout.row()
         col = row.column()
         col.prop(settings, 'filter', translate=False)
 
+        row = layout.row(align=True)
+        row.prop(settings, "use_deferred_update", toggle=True)
+        sub = row.row(align=True)
+        sub.active = settings.use_deferred_update
+        sub.prop(settings, "update_rate")
+
         row = layout.row()
         col = row.column()
         col.operator(PROPERTIES_OT_UpdateShapekeys.bl_idname,
                      text="Update")
         col = row.column()
+        col.prop(settings, "auto_update", toggle=True)
+        col = row.column()
         col.operator(PROPERTIES_OT_ClearShapekeys.bl_idname,
                      text="Clear")
 
@@ -549,6 +3112,13 @@ class PROPERTIES_PT_TareminPanel(bpy.types.Panel):
         op_set = row.operator(
             PROPERTIES_OT_SetAllShapekeyValues.bl_idname, text="Set All to 1.0")
         op_set.value = 1.0
+        row.operator(PROPERTIES_OT_KeyframeShapekeys.bl_idname, text="", icon='KEY_HLT')
+        row.operator(PROPERTIES_OT_BindMaster.bl_idname, text="", icon='DRIVER')
+        row.operator(PROPERTIES_OT_UnbindMaster.bl_idname, text="", icon='UNLINKED')
+        row.operator(MOS_OT_CheckCatalogCoverage.bl_idname, text="", icon='VIEWZOOM')
+        row.operator_menu_enum(PROPERTIES_OT_MirrorShapekeys.bl_idname, "direction", text="", icon='MOD_MIRROR')
+        row.operator(PROPERTIES_OT_NewShapeFromMix.bl_idname, text="", icon='SHAPEKEY_DATA')
+        row.operator(PROPERTIES_OT_FindEmptyShapekeys.bl_idname, text="", icon='GHOST_ENABLED')
 
         layout.template_list(
             listtype_name='PROPERTIES_UL_TareminMultiObjectShapekeyList',
@@ -587,13 +3157,16 @@ class PROPERTIES_PT_TareminPanel(bpy.types.Panel):
             col.separator()
             col.operator(MOS_OT_ImportPresets.bl_idname, icon='IMPORT', text="")
             col.operator(MOS_OT_ExportPresets.bl_idname, icon='EXPORT', text="")
+            col.operator(MOS_OT_MigratePresets.bl_idname, icon='LINKED', text="")
 
             row = box.row(align=True)
             op_replace = row.operator(
                 MOS_OT_LoadPreset.bl_idname, text="Load (Replace)")
             op_replace.mode = 'REPLACE'
+            op_replace.refresh_list = settings.auto_update
             op_add = row.operator(MOS_OT_LoadPreset.bl_idname, text="Load (Add)")
             op_add.mode = 'ADD'
+            op_add.refresh_list = settings.auto_update
             
             # --- Selected Preset Details UI ---
             if settings.presets and settings.active_preset_index < len(settings.presets):
@@ -601,33 +3174,107 @@ class PROPERTIES_PT_TareminPanel(bpy.types.Panel):
                 
                 details_box = box.box() # Use a new box for the details section
                 details_row = details_box.row()
-                details_row.prop(settings, "show_preset_details", text=f"Contents of '{selected_preset.name}'", toggle=True,
+                details_row.prop(settings, "show_preset_details",
+                                 text=f"Contents of '{selected_preset.name}' ({len(selected_preset.object_names)})", toggle=True,
                                  icon="TRIA_DOWN" if settings.show_preset_details else "TRIA_RIGHT")
                 
                 if settings.show_preset_details:
-                    obj_names_list = [obj.name for obj in selected_preset.object_names]
-                    if obj_names_list:
-                        # Display each object with a remove button
-                        for obj_name in obj_names_list:
-                            row = details_box.row(align=True)
-                            row.label(text=obj_name, icon='OBJECT_DATAMODE')
-                            op = row.operator(MOS_OT_RemoveObjectFromPreset.bl_idname, text="", icon='X')
-                            op.object_name = obj_name
+                    if selected_preset.object_names:
+                        # UIList は表示されている行だけを描画する
+                        details_box.template_list("MOS_UL_PresetObjectList", "",
+                                                  selected_preset, "object_names",
+                                                  selected_preset, "active_object_index", rows=5)
                     else:
                         details_box.label(text="(No objects in this preset)", icon='INFO')
                     
                     # Add a button to add selected objects to the preset
                     details_box.separator()
-                    details_box.operator(
+                    row = details_box.row(align=True)
+                    row.operator(
                         MOS_OT_AddSelectedToPreset.bl_idname, 
                         text="Add Selected Objects", 
                         icon='PLUS')
+                    row.operator(
+                        MOS_OT_RemoveSelectedFromPreset.bl_idname,
+                        text="Remove Selected",
+                        icon='REMOVE')
+                    row.operator(
+                        MOS_OT_SyncPresetToSelection.bl_idname,
+                        text="Sync to Selection",
+                        icon='FILE_REFRESH')
+
+                # --- Value Snapshots UI ---
+                snapshots_box = box.box()
+                snapshots_box.prop(settings, "show_snapshots", text="Value Snapshots", toggle=True,
+                                   icon="TRIA_DOWN" if settings.show_snapshots else "TRIA_RIGHT")
+                if settings.show_snapshots:
+                    row = snapshots_box.row()
+                    row.template_list("MOS_UL_SnapshotList", "",
+                                      selected_preset, "snapshots",
+                                      selected_preset, "active_snapshot_index", rows=3)
+                    col = row.column(align=True)
+                    col.operator(MOS_OT_CaptureValueSnapshot.bl_idname, icon='ADD', text="")
+                    col.operator(MOS_OT_RemoveValueSnapshot.bl_idname, icon='REMOVE', text="")
+                    snapshots_box.operator(MOS_OT_RestoreValueSnapshot.bl_idname, text="Restore", icon='RECOVER_LAST')
+                    row = snapshots_box.row(align=True)
+                    row.prop(settings, "blend_factor", slider=True)
+                    row.operator(MOS_OT_BlendValueSnapshot.bl_idname, text="", icon='IPO_EASE_IN_OUT')
+
+        # --- Live Input UI ---
+        box = layout.box()
+        box.prop(settings, "show_live", text="Live Input", toggle=True,
+                 icon="TRIA_DOWN" if settings.show_live else "TRIA_RIGHT")
+        if settings.show_live:
+            col = box.column(align=True)
+            col.enabled = not live_input.running
+            row = col.row(align=True)
+            row.prop(settings, "live_host")
+            row.prop(settings, "live_port")
+            col.prop(settings, "live_rate")
+            if live_input.running:
+                box.operator(MOS_OT_StopLiveInput.bl_idname, text="Stop", icon='PAUSE')
+                summary = live_input.get_summary()
+                col = box.column(align=True)
+                col.label(text=f"{summary['received']} received, {summary['applied']} applied, "
+                               f"{summary['dropped']} dropped, {summary['errors']} invalid", translate=False)
+                col.label(text=f"Latency: queue {summary['queue_latency_ms']:.1f} ms (max {summary['queue_latency_max_ms']:.1f}), "
+                               f"total {summary['total_latency_ms']:.1f} ms (max {summary['total_latency_max_ms']:.1f})",
+                          translate=False)
+                if live_input.listener.error:
+                    col.label(text=live_input.listener.error, icon='ERROR', translate=False)
+            else:
+                box.operator(MOS_OT_StartLiveInput.bl_idname, text="Start", icon='PLAY')
+
+        # --- Performance Stats UI ---
+        box = layout.box()
+        box.prop(settings, "show_stats", text="Performance Stats", toggle=True,
+                 icon="TRIA_DOWN" if settings.show_stats else "TRIA_RIGHT")
+        if settings.show_stats:
+            preferences = get_preferences(context)
+            if preferences is not None:
+                box.prop(preferences, "enable_profiling")
+
+            if profiler.totals:
+                col = box.column(align=True)
+                for name, (calls, total_time, objects, keys) in sorted(profiler.totals.items()):
+                    split = col.split(factor=0.45)
+                    split.label(text=name, translate=False)
+                    split.label(text=f"{calls} calls, {total_time * 1000:.1f} ms (avg {total_time * 1000 / calls:.2f} ms), "
+                                     f"{objects} obj, {keys} keys", translate=False)
+            else:
+                box.label(text="(No stats recorded)", icon='INFO')
+
+            row = box.row(align=True)
+            row.operator(MOS_OT_ExportStats.bl_idname, text="Export", icon='EXPORT')
+            row.operator(MOS_OT_ResetStats.bl_idname, text="Reset", icon='X')
 
 
 
 classesToRegister = [
     # PropertyGroup classes that are types for other properties
     TareminMultiObjectShapekeyProperty,
+    MOS_PresetObject,
+    MOS_ValueSnapshot,
     MOS_SelectionPreset,
     TareminMultiObjectShapekeyProps, # This now depends on the two above
 
@@ -636,16 +3283,125 @@ classesToRegister = [
     PROPERTIES_OT_UpdateShapekeys,
     PROPERTIES_OT_ClearShapekeys,
     PROPERTIES_OT_SetAllShapekeyValues,
+    PROPERTIES_OT_KeyframeShapekeys,
+    PROPERTIES_OT_MirrorShapekeys,
+    PROPERTIES_OT_NewShapeFromMix,
+    PROPERTIES_OT_FindEmptyShapekeys,
+    PROPERTIES_OT_BindMaster,
+    PROPERTIES_OT_UnbindMaster,
     PROPERTIES_UL_TareminMultiObjectShapekeyList,
     MOS_UL_PresetList,
+    MOS_UL_PresetObjectList,
     MOS_OT_AddPreset,
     MOS_OT_RemovePreset,
     MOS_OT_LoadPreset,
     MOS_OT_MovePreset,
     MOS_OT_RemoveObjectFromPreset,
     MOS_OT_AddSelectedToPreset,
+    MOS_OT_RemoveSelectedFromPreset,
+    MOS_OT_SyncPresetToSelection,
+    MOS_OT_MigratePresets,
+    MOS_UL_SnapshotList,
+    MOS_OT_CaptureValueSnapshot,
+    MOS_OT_RestoreValueSnapshot,
+    MOS_OT_BlendValueSnapshot,
+    MOS_OT_RemoveValueSnapshot,
     MOS_OT_ExportPresets,
     MOS_OT_ImportPresets,
+    MOS_OT_CheckCatalogCoverage,
+    MOS_OT_StartLiveInput,
+    MOS_OT_StopLiveInput,
+    MOS_OT_ExportStats,
+    MOS_OT_ResetStats,
+    MultiObjectShapekeyAddonPreferences,
+]
+
+
+@persistent
+def on_depsgraph_update(*args):
+    # 更新されたデータのシェイプキー名キャッシュを検証する
+    # (Blender 2.80 ではハンドラに depsgraph が渡されないので全て破棄する)
+    context = bpy.context
+    if len(args) > 1:
+        updates = args[1].updates
+        # 値の変更ではキャッシュを保持し、キーの追加・削除・並び替えがあったデータだけを破棄する
+        layout_changed = shapekey_names.validate_updates(updates) | shapekey_names.validate_order(context.object)
+        key_displacements.discard_updates(updates)
+        view_layer_objects.expire_misses()
+        # 選択の変更はシーンの更新として通知される
+        scene_changed = any(isinstance(update.id, bpy.types.Scene) for update in updates)
+    else:
+        shapekey_names.clear()
+        key_displacements.clear()
+        selection_names.clear()
+        view_layer_objects.clear()
+        layout_changed = False
+        scene_changed = True
+
+    # 選択状態やシェイプキーの構成が変わっていたらインデックスとブレンドの基準値を破棄する
+    # (選択されたオブジェクトの集合を比べるのはシーンの更新があったときだけ)
+    if layout_changed:
+        shapekey_index.invalidate()
+        snapshot_blend.reset()
+    if scene_changed:
+        state = get_selection_state(context)
+        shapekey_index.validate(state)
+        snapshot_blend.validate(state)
+        selection_names.validate(state)
+        view_layer_objects.validate(state)
+    # インデックスが破棄された (= 選択が変わった) ら一覧の自動更新を予約する
+    if shapekey_index.blocks is None and get_settings(context).auto_update:
+        schedule_auto_refresh()
+
+
+# メッセージバスの購読の所有者
+msgbus_owner = object()
+
+
+def on_shapekey_renamed():
+    """Message bus callback: a shape key was renamed, so every name-keyed cache is stale."""
+    shapekey_names.clear()
+    key_displacements.clear()
+    shapekey_index.invalidate()
+    if get_settings(bpy.context).auto_update:
+        schedule_auto_refresh()
+
+
+def subscribe_msgbus():
+    # ファイルを読み込むと購読が解除されるので、読み込みのたびに購読し直す
+    bpy.msgbus.clear_by_owner(msgbus_owner)
+    bpy.msgbus.subscribe_rna(
+        key=(bpy.types.ShapeKey, "name"), owner=msgbus_owner, args=(), notify=on_shapekey_renamed)
+
+
+@persistent
+def on_file_changed(*args):
+    # ファイル読み込みやアンドゥ後は保持しているポインタが無効になっている可能性がある
+    cancel_pending_values()
+    shapekey_index.invalidate()
+    shapekey_names.clear()
+    key_displacements.clear()
+    empty_keys.clear()
+    selection_names.clear()
+    view_layer_objects.clear()
+    preset_members.clear()
+    shapekey_list_filter.touch()
+    snapshot_blend.reset()
+    subscribe_msgbus()
+
+
+@persistent
+def on_load_post(*args):
+    # 古いバージョンで保存された名前だけのプリセットをオブジェクトへの参照に移行する
+    migrate_presets(bpy.data.scenes)
+
+
+handlersToRegister = [
+    (bpy.app.handlers.depsgraph_update_post, on_depsgraph_update),
+    (bpy.app.handlers.load_post, on_file_changed),
+    (bpy.app.handlers.load_post, on_load_post),
+    (bpy.app.handlers.undo_post, on_file_changed),
+    (bpy.app.handlers.redo_post, on_file_changed),
 ]
 
 
@@ -655,9 +3411,33 @@ def register():
     # Assign the PointerProperty. If it already exists, it will be overwritten.
     bpy.types.Scene.taremin_mos = bpy.props.PointerProperty(
         type=TareminMultiObjectShapekeyProps)
+    for handlers, handler in handlersToRegister:
+        if handler not in handlers:
+            handlers.append(handler)
+    subscribe_msgbus()
+    preferences = get_preferences(bpy.context)
+    if preferences is not None:
+        update_profiling(preferences, bpy.context)
 
 
 def unregister():
+    for handlers, handler in handlersToRegister:
+        if handler in handlers:
+            handlers.remove(handler)
+    bpy.msgbus.clear_by_owner(msgbus_owner)
+    cancel_pending_values()
+    live_input.stop()
+    if bpy.app.timers.is_registered(run_auto_refresh):
+        bpy.app.timers.unregister(run_auto_refresh)
+    shapekey_index.invalidate()
+    shapekey_names.clear()
+    key_displacements.clear()
+    empty_keys.clear()
+    selection_names.clear()
+    view_layer_objects.clear()
+    preset_members.clear()
+    snapshot_blend.reset()
+    profiler.enabled = False
     for value in classesToRegister:
         bpy.utils.unregister_class(value)
     del bpy.types.Scene.taremin_mos
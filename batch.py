@@ -0,0 +1,268 @@
+"""Apply shape key values to many .blend files without the UI.
+
+Run inside Blender:
+
+    blender --background --python batch.py -- --values values.json [options] a.blend b.blend ...
+
+or from a plain Python interpreter, in which case every file is processed by
+a background Blender instance (see --blender):
+
+    python batch.py --values values.csv --jobs 4 --save assets/*.blend
+
+The values file is either a JSON object ({"shape key": value, ...}) or a CSV
+file with "name,value" rows. The shape keys are resolved on the target
+objects with the same UNION / INTERSECTION semantics as the panel's list.
+"""
+import argparse
+import csv
+import fnmatch
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+# ワーカーが標準出力に書き出す統計行の接頭辞
+STATS_PREFIX = "MOS_STATS "
+STATS_FIELDS = [
+    "file", "status", "objects", "keys", "datablocks",
+    "load_time", "apply_time", "save_time", "total_time", "error",
+]
+
+
+def import_addon():
+    """Import the addon package that contains this script."""
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    parent_dir = os.path.dirname(package_dir)
+    if parent_dir not in sys.path:
+        sys.path.insert(0, parent_dir)
+    return importlib.import_module(os.path.basename(package_dir))
+
+
+def load_values(path):
+    """Load a {shape key name: value} map from a JSON or CSV file."""
+    if path.lower().endswith(".csv"):
+        values = {}
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            for row in csv.reader(f):
+                if len(row) < 2 or not row[0].strip():
+                    continue
+                try:
+                    values[row[0]] = float(row[1])
+                except ValueError:
+                    # ヘッダー行などは読み飛ばす
+                    continue
+        return values
+
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("JSON values file must be an object of {shape key name: value}")
+    return {str(name): float(value) for name, value in data.items()}
+
+
+def find_target_objects(scene, pattern=None, preset=None):
+    """Get the mesh objects of the scene, optionally filtered by a name pattern or a preset."""
+    objects = [obj for obj in scene.objects if obj.type == 'MESH']
+    if preset is not None:
+        presets = {p.name: p for p in scene.taremin_mos.presets}
+        if preset not in presets:
+            raise ValueError(f"Preset '{preset}' not found")
+        names = {item.object.name if item.object else item.name for item in presets[preset].object_names}
+        objects = [obj for obj in objects if obj.name in names]
+    if pattern is not None:
+        objects = [obj for obj in objects if fnmatch.fnmatchcase(obj.name, pattern)]
+    return objects
+
+
+def apply_values(addon, objects, values, mode):
+    """Apply the values to the shape keys that the objects have in common (or in total).
+
+    Returns a (keys, datablocks) tuple with the number of resolved shape key
+    names and the number of shape key datablocks that changed.
+    """
+    names = set(addon.collect_shapekey_names(objects, mode))
+    targets = {name: value for name, value in values.items() if name in names}
+    if not targets:
+        return 0, 0
+    return len(targets), addon.write_values_bulk(objects, targets)
+
+
+def process_file(addon, filepath, args, values):
+    """Open, apply and optionally save one .blend file. Returns a stats dict."""
+    stats = dict.fromkeys(STATS_FIELDS, "")
+    stats.update(file=filepath, status="OK", objects=0, keys=0, datablocks=0)
+    start = time.perf_counter()
+    try:
+        bpy.ops.wm.open_mainfile(filepath=filepath)
+        loaded = time.perf_counter()
+        stats["load_time"] = loaded - start
+
+        objects = find_target_objects(bpy.context.scene, args.objects, args.preset)
+        keys, datablocks = apply_values(addon, objects, values, args.filter)
+        applied = time.perf_counter()
+        stats.update(objects=len(objects), keys=keys, datablocks=datablocks,
+                     apply_time=applied - loaded)
+
+        if args.output_dir:
+            output = os.path.join(args.output_dir, os.path.basename(filepath))
+            bpy.ops.wm.save_as_mainfile(filepath=output, copy=True)
+        elif args.save and datablocks:
+            bpy.ops.wm.save_mainfile()
+        stats["save_time"] = time.perf_counter() - applied
+    except Exception as e:
+        stats.update(status="ERROR", error=str(e))
+    stats["total_time"] = time.perf_counter() - start
+    return stats
+
+
+def build_worker_command(args, filepath):
+    command = [
+        args.blender, "--background", "--factory-startup",
+        "--python", os.path.abspath(__file__), "--",
+        "--worker", "--values", os.path.abspath(args.values), "--filter", args.filter,
+    ]
+    if args.objects is not None:
+        command += ["--objects", args.objects]
+    if args.preset is not None:
+        command += ["--preset", args.preset]
+    if args.save:
+        command.append("--save")
+    if args.output_dir:
+        command += ["--output-dir", os.path.abspath(args.output_dir)]
+    command.append(os.path.abspath(filepath))
+    return command
+
+
+def run_blender(command, prefix):
+    """Run a background Blender and get the JSON it printed on a line starting with prefix.
+
+    Returns a (result, return code) tuple; result is None if no such line was printed.
+    """
+    result = subprocess.run(
+        command,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        universal_newlines=True, encoding='utf-8', errors='replace')
+    for line in result.stdout.splitlines():
+        if line.startswith(prefix):
+            return json.loads(line[len(prefix):]), result.returncode
+    return None, result.returncode
+
+
+def map_jobs(function, items, jobs):
+    """Call function for every item on up to `jobs` threads and yield the results in order.
+
+    Used to run several background Blender instances in parallel.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        yield from executor.map(function, items)
+
+
+def run_worker(args, filepath):
+    """Process one file in a separate background Blender and collect its stats."""
+    start = time.perf_counter()
+    stats, returncode = run_blender(build_worker_command(args, filepath), STATS_PREFIX)
+    if stats is not None:
+        return stats
+
+    stats = dict.fromkeys(STATS_FIELDS, "")
+    stats.update(file=filepath, status="ERROR", objects=0, keys=0, datablocks=0,
+                 total_time=time.perf_counter() - start,
+                 error=f"Blender exited with code {returncode} without stats")
+    return stats
+
+
+def iter_stats(args):
+    """Process all files and yield the stats of each file as soon as it is done."""
+    if bpy is None or args.jobs > 1:
+        yield from map_jobs(lambda filepath: run_worker(args, filepath), args.files, args.jobs)
+        return
+
+    addon = import_addon()
+    # アドオンが有効になっていない場合はプリセットのプロパティを使えるように登録する
+    if not hasattr(bpy.types.Scene, "taremin_mos"):
+        addon.register()
+    values = load_values(args.values)
+    for filepath in args.files:
+        yield process_file(addon, filepath, args, values)
+
+
+class StatsWriter:
+    """Write stats rows to a CSV or JSON Lines file as they arrive."""
+
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.csv = None
+        if path.lower().endswith(".csv"):
+            self.csv = csv.DictWriter(self.file, fieldnames=STATS_FIELDS)
+            self.csv.writeheader()
+
+    def write(self, stats):
+        if self.csv is not None:
+            self.csv.writerow(stats)
+        else:
+            self.file.write(json.dumps(stats, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="batch.py", description="Apply shape key values to many .blend files.")
+    parser.add_argument("files", nargs="+", help=".blend files to process")
+    parser.add_argument("--values", required=True, help="JSON or CSV file of shape key values")
+    parser.add_argument("--filter", choices=("UNION", "INTERSECTION"), default="UNION",
+                        help="Which shape keys of the target objects are affected (default: UNION)")
+    parser.add_argument("--objects", help="Only affect mesh objects whose name matches this pattern")
+    parser.add_argument("--preset", help="Only affect the objects of this selection preset")
+    parser.add_argument("--save", action="store_true", help="Save the changed files in place")
+    parser.add_argument("--output-dir", help="Save a copy of every processed file to this directory")
+    parser.add_argument("--stats", help="Write per-file timing stats to this CSV or JSON Lines file")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Number of background Blender instances to run in parallel")
+    parser.add_argument("--blender", default=bpy.app.binary_path if bpy else "blender",
+                        help="Blender executable used for parallel jobs")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    args = parse_args(argv)
+
+    if args.worker:
+        addon = import_addon()
+        if not hasattr(bpy.types.Scene, "taremin_mos"):
+            addon.register()
+        stats = process_file(addon, args.files[0], args, load_values(args.values))
+        print(STATS_PREFIX + json.dumps(stats, ensure_ascii=False), flush=True)
+        return 0
+
+    writer = StatsWriter(args.stats) if args.stats else None
+    failed = 0
+    try:
+        for stats in iter_stats(args):
+            if stats["status"] != "OK":
+                failed += 1
+            print(f"[{stats['status']}] {stats['file']}: {stats['keys']} keys, "
+                  f"{stats['datablocks']} datablocks, {float(stats['total_time'] or 0):.3f}s "
+                  f"{stats['error']}", flush=True)
+            if writer:
+                writer.write(stats)
+    finally:
+        if writer:
+            writer.close()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
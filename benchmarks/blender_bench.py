@@ -0,0 +1,181 @@
+"""Benchmark the addon's hot paths on a synthetic scene.
+
+Run with Blender in background mode:
+
+    blender --background --factory-startup --python benchmarks/blender_bench.py -- \
+        --objects 200 --keys 300 --overlap 0.8 --linked 0.5 \
+        --output report.json --baseline baseline.json --threshold 0.2
+
+The scene is generated from the given counts and seed, so reports made with
+the same parameters can be compared. When --baseline is given, the script
+exits with code 1 if any benchmark got slower than the threshold allows.
+"""
+import argparse
+import importlib
+import os
+import random
+import sys
+import tempfile
+
+import bpy
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PACKAGE_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import report  # noqa: E402
+
+
+def import_addon():
+    """Import and register the addon package this script belongs to."""
+    sys.path.insert(0, os.path.dirname(PACKAGE_DIR))
+    addon = importlib.import_module(os.path.basename(PACKAGE_DIR))
+    if not hasattr(bpy.types.Scene, "taremin_mos"):
+        addon.register()
+    return addon
+
+
+def generate_scene(objects, keys, overlap, linked, verts, seed):
+    """Create a scene of mesh objects with shape keys and select all of them.
+
+    Every object gets `keys` shape keys (plus Basis). The first overlap * keys
+    names are shared by all objects, the rest are unique to the object. A
+    `linked` fraction of the objects are linked duplicates of an earlier mesh.
+    """
+    rng = random.Random(seed)
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    scene = bpy.context.scene
+
+    shared = round(keys * overlap)
+    common_names = [f"Common_{i:04d}" for i in range(shared)]
+    coords = [(rng.random(), rng.random(), rng.random()) for _ in range(verts)]
+
+    meshes = []
+    for i in range(objects):
+        name = f"Object_{i:05d}"
+        if meshes and rng.random() < linked:
+            obj = bpy.data.objects.new(name, rng.choice(meshes))
+            scene.collection.objects.link(obj)
+            continue
+
+        mesh = bpy.data.meshes.new(f"Mesh_{i:05d}")
+        mesh.from_pydata(coords, [], [])
+        obj = bpy.data.objects.new(name, mesh)
+        scene.collection.objects.link(obj)
+        obj.shape_key_add(name="Basis")
+        for key_name in common_names + [f"{name}_Key_{k:04d}" for k in range(keys - shared)]:
+            obj.shape_key_add(name=key_name, from_mix=False)
+        meshes.append(mesh)
+
+    view_layer = bpy.context.view_layer
+    for obj in scene.objects:
+        obj.select_set(True)
+    view_layer.objects.active = scene.objects[0] if scene.objects else None
+    view_layer.update()
+
+
+def run_benchmarks(addon, args):
+    context = bpy.context
+    settings = addon.get_settings(context)
+    repeat = args.repeat
+    results = {}
+
+    for mode in ('UNION', 'INTERSECTION'):
+        settings.filter = mode
+        results[f"get_shapekeys.{mode.lower()}.cold"] = report.measure(
+            lambda: addon.get_shapekeys(context), repeat, setup=addon.shapekey_names.clear)
+        results[f"get_shapekeys.{mode.lower()}.warm"] = report.measure(
+            lambda: addon.get_shapekeys(context), repeat)
+
+    settings.filter = 'UNION'
+    results["refresh_list.full"] = report.measure(
+        lambda: addon.refresh_shapekey_list(context), repeat, setup=settings.collection.clear)
+    results["refresh_list.unchanged"] = report.measure(
+        lambda: addon.refresh_shapekey_list(context), repeat)
+
+    # スライダー操作 (update_selected_objects) を一覧の先頭から順に行う
+    items = list(settings.collection)[:args.slider_keys]
+    step = [0]
+
+    def drag():
+        step[0] += 1
+        for i, item in enumerate(items):
+            item.value = ((step[0] + i) % 10) / 10.0
+
+    addon.shapekey_index.invalidate()
+    results["slider_update.first"] = report.measure(drag, 1)
+    results["slider_update"] = report.measure(drag, repeat)
+
+    def set_all():
+        step[0] += 1
+        bpy.ops.taremin.mos_set_all_values(value=float(step[0] % 2))
+
+    results["set_all_values"] = report.measure(set_all, repeat)
+
+    # プリセット: 全オブジェクトを含むプリセットを args.presets 個作る
+    settings.presets.clear()
+    object_names = [obj.name for obj in context.scene.objects]
+    for i in range(args.presets):
+        preset = settings.presets.add()
+        preset.name = f"Preset_{i:03d}"
+        for name in object_names:
+            preset.add_object(name)
+    settings.active_preset_index = 0
+    results["preset_load"] = report.measure(
+        lambda: bpy.ops.taremin.mos_preset_load(mode='REPLACE'), repeat)
+
+    with tempfile.TemporaryDirectory() as directory:
+        filepath = os.path.join(directory, "presets.jsonl")
+        results["preset_export"] = report.measure(
+            lambda: bpy.ops.taremin.mos_preset_export(filepath=filepath), repeat)
+        results["preset_import"] = report.measure(
+            lambda: bpy.ops.taremin.mos_preset_import(filepath=filepath, overwrite=True), repeat)
+    return results
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="blender_bench.py", description=__doc__.splitlines()[0])
+    parser.add_argument("--objects", type=int, default=200, help="Number of objects")
+    parser.add_argument("--keys", type=int, default=100, help="Shape keys per object (without Basis)")
+    parser.add_argument("--overlap", type=float, default=0.8, help="Fraction of keys shared by all objects")
+    parser.add_argument("--linked", type=float, default=0.0, help="Fraction of objects that are linked duplicates")
+    parser.add_argument("--verts", type=int, default=8, help="Vertices per mesh")
+    parser.add_argument("--presets", type=int, default=10, help="Number of presets for import/export")
+    parser.add_argument("--slider-keys", type=int, default=20, help="Number of slider updates per run")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Compare against this JSON report")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed slowdown against the baseline (0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    args = parse_args(argv)
+
+    # 工場出荷設定の読み込みでアドオンの登録が外れないよう、シーンの生成後に登録する
+    generate_scene(args.objects, args.keys, args.overlap, args.linked, args.verts, args.seed)
+    addon = import_addon()
+    results = run_benchmarks(addon, args)
+
+    params = {
+        name: getattr(args, name)
+        for name in ("objects", "keys", "overlap", "linked", "verts", "presets", "slider_keys", "repeat", "seed")
+    }
+    result = report.make_report(params, results, {"blender": bpy.app.version_string})
+    report.print_results(results)
+    if args.output:
+        report.write_report(result, args.output)
+
+    if args.baseline:
+        rows = report.compare(result, report.load_report(args.baseline), args.threshold)
+        report.print_comparison(rows)
+        if not all(ok for *_, ok in rows):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
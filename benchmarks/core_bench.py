@@ -0,0 +1,148 @@
+"""Benchmark the addon's algorithms in plain CPython, without Blender.
+
+The addon is imported against the fake bpy of fake_bpy.py, so selections far
+larger than a real scene would allow can be measured in seconds:
+
+    python benchmarks/core_bench.py --objects 100000 --keys 50 --output core.json
+
+The report has the same format as blender_bench.py and can be compared with
+--baseline / --threshold in the same way. Absolute times are not comparable
+with the Blender benchmark, since the fake data is plain Python objects.
+"""
+import argparse
+import importlib
+import os
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PACKAGE_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import fake_bpy  # noqa: E402
+import report  # noqa: E402
+
+
+def import_addon():
+    """Import and register the addon against the fake bpy, timing both steps."""
+    bpy = fake_bpy.install()
+    sys.path.insert(0, os.path.dirname(PACKAGE_DIR))
+    modules = []
+    results = {
+        "addon.import": report.measure(
+            lambda: modules.append(importlib.import_module(os.path.basename(PACKAGE_DIR))), 1),
+    }
+    addon = modules[0]
+    results["addon.register"] = report.measure(addon.register, 1)
+    return bpy, addon, results
+
+
+def run_core_benchmarks(core, layouts, repeat):
+    results = {}
+    for mode in ('UNION', 'INTERSECTION'):
+        results[f"core.combine_names.{mode.lower()}"] = report.measure(
+            lambda: core.combine_names(layouts, mode), repeat)
+
+    names = core.combine_names(layouts, 'UNION')
+    # 選択の変更で一部のキーだけが入れ替わった状態を想定する
+    block = max(1, len(names) // 100)
+    shuffled = names[block:-block] + names[:block]
+    results["core.plan_list_update.unchanged"] = report.measure(
+        lambda: core.plan_list_update(names, names), repeat)
+    results["core.plan_list_update.reordered"] = report.measure(
+        lambda: core.plan_list_update(shuffled, names), repeat)
+    results["core.missing_names"] = report.measure(
+        lambda: core.missing_names(names[::2], names), repeat)
+
+    entries = [(f"Object_{i:06d}", layout[0], [0.5] * len(layout[0])) for i, layout in enumerate(layouts)]
+    data = core.pack_snapshot(entries)
+    results["core.pack_snapshot"] = report.measure(lambda: core.pack_snapshot(entries), repeat)
+    results["core.unpack_snapshot"] = report.measure(lambda: core.unpack_snapshot(data), repeat)
+    return results
+
+
+def run_addon_benchmarks(bpy, addon, args):
+    context = bpy.context
+    settings = addon.get_settings(context)
+    repeat = args.repeat
+    results = {}
+
+    for mode in ('UNION', 'INTERSECTION'):
+        settings.filter = mode
+        results[f"get_shapekeys.{mode.lower()}.cold"] = report.measure(
+            lambda: addon.get_shapekeys(context), repeat, setup=addon.shapekey_names.clear)
+        results[f"get_shapekeys.{mode.lower()}.warm"] = report.measure(
+            lambda: addon.get_shapekeys(context), repeat)
+
+    settings.filter = 'UNION'
+    results["refresh_list.full"] = report.measure(
+        lambda: addon.refresh_shapekey_list(context), repeat, setup=settings.collection.clear)
+    results["refresh_list.unchanged"] = report.measure(
+        lambda: addon.refresh_shapekey_list(context), repeat)
+
+    items = list(settings.collection)[:args.slider_keys]
+    step = [0]
+
+    def drag():
+        step[0] += 1
+        for i, item in enumerate(items):
+            item.value = ((step[0] + i) % 10) / 10.0
+
+    addon.shapekey_index.invalidate()
+    results["slider_update.first"] = report.measure(drag, 1)
+    results["slider_update"] = report.measure(drag, repeat)
+
+    values = {item.name: 1.0 for item in settings.collection}
+    objects = context.selected_objects
+    results["write_values_bulk"] = report.measure(
+        lambda: addon.write_values_bulk(objects, values), repeat)
+    return results
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="core_bench.py", description=__doc__.splitlines()[0])
+    parser.add_argument("--objects", type=int, default=100000, help="Number of objects")
+    parser.add_argument("--keys", type=int, default=50, help="Shape keys per object (without Basis)")
+    parser.add_argument("--overlap", type=float, default=0.98, help="Fraction of keys shared by all objects")
+    parser.add_argument("--linked", type=float, default=0.0, help="Fraction of objects that are linked duplicates")
+    parser.add_argument("--slider-keys", type=int, default=20, help="Number of slider updates per run")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark")
+    parser.add_argument("--core-only", action="store_true", help="Only benchmark core.py, not the addon")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Compare against this JSON report")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed slowdown against the baseline (0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    bpy, addon, results = import_addon()
+    scene = fake_bpy.make_scene(args.objects, args.keys, args.overlap, args.linked)
+    layouts = [addon.core.make_layout(block.name for block in obj.data.shape_keys.key_blocks)
+               for obj in scene.objects]
+
+    results.update(run_core_benchmarks(addon.core, layouts, args.repeat))
+    if not args.core_only:
+        results.update(run_addon_benchmarks(bpy, addon, args))
+    addon.unregister()
+
+    params = {
+        name: getattr(args, name)
+        for name in ("objects", "keys", "overlap", "linked", "slider_keys", "repeat", "core_only")
+    }
+    result = report.make_report(params, results, {"bpy": "fake"})
+    report.print_results(results)
+    if args.output:
+        report.write_report(result, args.output)
+
+    if args.baseline:
+        rows = report.compare(result, report.load_report(args.baseline), args.threshold)
+        report.print_comparison(rows)
+        if not all(ok for *_, ok in rows):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
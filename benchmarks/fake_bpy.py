@@ -0,0 +1,473 @@
+"""Lightweight stand-in for the parts of bpy that the addon uses.
+
+install() puts fake `bpy` and `bpy_extras` modules into sys.modules, so the
+addon can be imported, registered and driven from plain CPython, e.g. to
+benchmark selections far larger than a real scene would allow:
+
+    import fake_bpy
+    bpy = fake_bpy.install()
+    addon = importlib.import_module("MultiObjectShapeKey")
+    addon.register()
+    fake_bpy.make_scene(objects=100000, keys=50)
+
+Only the behavior the addon relies on is emulated: property declarations
+with defaults and update callbacks, collections, objects with shape keys,
+selection, handlers, timers and message bus subscriptions. Nothing is evaluated or drawn.
+"""
+import functools
+import itertools
+import sys
+import types
+
+_pointers = itertools.count(1)
+
+
+class _Pointer:
+    """Mixin giving each instance a stable as_pointer() value."""
+
+    def as_pointer(self):
+        pointer = self.__dict__.get("_pointer")
+        if pointer is None:
+            pointer = self.__dict__["_pointer"] = next(_pointers)
+        return pointer
+
+
+# --- Properties ---------------------------------------------------------------
+
+class Property:
+    """A bpy.props declaration. Instances live in class annotations."""
+
+    def __init__(self, kind, **options):
+        self.kind = kind
+        self.options = options
+
+    def default(self):
+        if self.kind == 'CollectionProperty':
+            return Collection(self.options.get("type"))
+        if self.kind == 'PointerProperty':
+            item_type = self.options.get("type")
+            if isinstance(item_type, type) and issubclass(item_type, PropertyGroup):
+                return item_type()
+            return None
+        if "default" in self.options:
+            return self.options["default"]
+        if self.kind == 'EnumProperty':
+            items = self.options.get("items") or ()
+            return items[0][0] if items and not callable(items) else ""
+        return {
+            'BoolProperty': False,
+            'IntProperty': 0,
+            'FloatProperty': 0.0,
+            'StringProperty': "",
+        }.get(self.kind)
+
+    def __get__(self, instance, owner):
+        # bpy.types.Scene.taremin_mos = PointerProperty(...) のようにクラスへ直接
+        # 代入されたプロパティは、インスタンスごとの値をここで作る
+        if instance is None:
+            return self
+        for name, value in vars(owner).items():
+            if value is self:
+                instance.__dict__[name] = result = self.default()
+                return result
+        raise AttributeError(self)
+
+
+class _Props(types.ModuleType):
+    def __getattr__(self, kind):
+        if not kind.endswith("Property"):
+            raise AttributeError(kind)
+        return lambda **options: Property(kind, **options)
+
+
+@functools.lru_cache(maxsize=None)
+def _annotations(cls):
+    result = {}
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).get("__annotations__", {}).items():
+            if isinstance(value, Property):
+                result[name] = value
+    return result
+
+
+class PropertyGroup(_Pointer):
+    """Fake bpy.types.PropertyGroup: annotated properties become attributes."""
+
+    def __init__(self):
+        for name, prop in _annotations(type(self)).items():
+            object.__setattr__(self, name, prop.default())
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        prop = _annotations(type(self)).get(name)
+        if prop is not None and prop.options.get("update"):
+            prop.options["update"](self, sys.modules["bpy"].context)
+
+
+class Collection:
+    """Fake bpy_prop_collection of PropertyGroup items."""
+
+    def __init__(self, item_type=None):
+        self.item_type = item_type or PropertyGroup
+        self.items = []
+
+    def add(self):
+        item = self.item_type()
+        self.items.append(item)
+        return item
+
+    def remove(self, index):
+        del self.items[index]
+
+    def move(self, from_index, to_index):
+        self.items.insert(to_index, self.items.pop(from_index))
+
+    def clear(self):
+        self.items.clear()
+
+    def foreach_get(self, attr, seq):
+        seq[:] = [getattr(item, attr) for item in self.items]
+
+    def foreach_set(self, attr, seq):
+        # 本物と同じく update コールバックは呼ばない
+        for item, value in zip(self.items, seq):
+            object.__setattr__(item, attr, value)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __bool__(self):
+        return bool(self.items)
+
+
+# --- Data ---------------------------------------------------------------------
+
+class ID(_Pointer):
+    def __init__(self, name):
+        self.name = name
+        self.library = None
+        self.animation_data = None
+        self.updates = 0
+
+    @property
+    def name_full(self):
+        return self.name
+
+    def update_tag(self, refresh=None):
+        self.updates += 1
+
+
+class KeyBlock(_Pointer):
+    def __init__(self, name, value=0.0):
+        self.name = name
+        self.value = value
+        self.mute = False
+        self.slider_min = 0.0
+        self.slider_max = 1.0
+
+
+class KeyBlocks:
+    """Fake collection of key blocks with find() and foreach access."""
+
+    def __init__(self, blocks):
+        self.blocks = blocks
+
+    def find(self, name):
+        for i, block in enumerate(self.blocks):
+            if block.name == name:
+                return i
+        return -1
+
+    def get(self, name, default=None):
+        index = self.find(name)
+        return self.blocks[index] if index != -1 else default
+
+    def foreach_get(self, attr, seq):
+        seq[:] = [getattr(block, attr) for block in self.blocks]
+
+    def foreach_set(self, attr, seq):
+        for block, value in zip(self.blocks, seq):
+            setattr(block, attr, float(value))
+
+    def __len__(self):
+        return len(self.blocks)
+
+    def __iter__(self):
+        return iter(self.blocks)
+
+    def __getitem__(self, index):
+        if isinstance(index, str):
+            return self.blocks[self.find(index)]
+        return self.blocks[index]
+
+
+class Key(ID):
+    def __init__(self, user, names):
+        super().__init__("Key")
+        self.user = user
+        self.use_relative = True
+        self.key_blocks = KeyBlocks([KeyBlock(name) for name in names])
+
+    @property
+    def reference_key(self):
+        return self.key_blocks[0]
+
+
+class Mesh(ID):
+    def __init__(self, name, key_names=None):
+        super().__init__(name)
+        self.shape_keys = Key(self, key_names) if key_names else None
+
+
+class Object(ID):
+    def __init__(self, name, data, type='MESH'):
+        super().__init__(name)
+        self.data = data
+        self.type = type
+        self.selected = False
+        self.mode = 'OBJECT'
+        self.active_shape_key_index = 0
+
+    def select_set(self, state, view_layer=None):
+        self.selected = state
+
+    def select_get(self, view_layer=None):
+        return self.selected
+
+
+class Scene(ID):
+    def __init__(self, name="Scene"):
+        super().__init__(name)
+        self.objects = []
+        self.frame_current = 1
+        self.frame_start = 1
+        self.frame_end = 250
+
+
+class DataCollection(dict):
+    """Fake bpy.data collection, keyed by name."""
+
+    def __iter__(self):
+        return iter(self.values())
+
+    def get(self, name, default=None):
+        return dict.get(self, name, default)
+
+
+# --- Context ------------------------------------------------------------------
+
+class LayerObjects:
+    def __init__(self, scene):
+        self.scene = scene
+        self.active = None
+
+    @property
+    def selected(self):
+        return [obj for obj in self.scene.objects if obj.selected]
+
+    def __iter__(self):
+        return iter(self.scene.objects)
+
+    def __len__(self):
+        return len(self.scene.objects)
+
+
+class ViewLayer(_Pointer):
+    def __init__(self, scene):
+        self.objects = LayerObjects(scene)
+
+    def update(self):
+        pass
+
+
+class Context:
+    def __init__(self, scene):
+        self.scene = scene
+        self.view_layer = ViewLayer(scene)
+        self.preferences = types.SimpleNamespace(addons={})
+        self.window_manager = types.SimpleNamespace(
+            windows=[], progress_begin=lambda low, high: None,
+            progress_update=lambda value: None, progress_end=lambda: None)
+
+    @property
+    def selected_objects(self):
+        return self.view_layer.objects.selected
+
+    @property
+    def active_object(self):
+        return self.view_layer.objects.active
+
+    @property
+    def object(self):
+        return self.view_layer.objects.active
+
+
+# --- Timers -------------------------------------------------------------------
+
+class Timers:
+    def __init__(self):
+        self.functions = {}
+
+    def register(self, function, first_interval=0.0, persistent=False):
+        self.functions[function] = first_interval
+
+    def unregister(self, function):
+        del self.functions[function]
+
+    def is_registered(self, function):
+        return function in self.functions
+
+    def run(self):
+        """Call every registered timer once, as if their interval had passed."""
+        for function in list(self.functions):
+            del self.functions[function]
+            interval = function()
+            if interval is not None:
+                self.functions[function] = interval
+
+
+# --- Message bus --------------------------------------------------------------
+
+class MessageBus:
+    """Fake bpy.msgbus. publish() stands in for an RNA property change."""
+
+    def __init__(self):
+        self.subscriptions = []
+
+    def subscribe_rna(self, key, owner, args, notify, options=set()):
+        self.subscriptions.append((key, owner, args, notify))
+
+    def clear_by_owner(self, owner):
+        self.subscriptions = [item for item in self.subscriptions if item[1] is not owner]
+
+    def publish(self, key):
+        for subscribed, owner, args, notify in list(self.subscriptions):
+            if subscribed == key:
+                notify(*args)
+
+
+# --- Installation -------------------------------------------------------------
+
+# Blender が登録時に引数の数を確認するコールバック (self を含む)
+_CALLBACK_ARGS = {
+    "execute": 2,
+    "invoke": 3,
+    "modal": 3,
+    "draw": 2,
+    "draw_item": 9,
+    "draw_filter": 3,
+    "filter_items": 4,
+}
+
+
+def _register_class(registered, cls):
+    """Register a class, checking the callbacks' argument counts like bpy_class_validate."""
+    for name, count in _CALLBACK_ARGS.items():
+        function = vars(cls).get(name)
+        if function is None or not hasattr(function, "__code__"):
+            continue
+        found = function.__code__.co_argcount
+        if found != count:
+            raise ValueError(
+                f"expected {cls.__name__}, {name} function to have {count} args, found {found}")
+    registered.add(cls)
+
+
+def _type(name, base=_Pointer):
+    return type(name, (base,), {})
+
+
+def install():
+    """Install the fake modules into sys.modules and return the fake bpy."""
+    bpy = types.ModuleType("bpy")
+    bpy.props = _Props("bpy.props")
+    bpy.types = types.ModuleType("bpy.types")
+    for name in ("Operator", "Panel", "UIList", "Menu", "AddonPreferences"):
+        setattr(bpy.types, name, _type(name))
+    bpy.types.PropertyGroup = PropertyGroup
+    bpy.types.ID = ID
+    bpy.types.Key = Key
+    bpy.types.ShapeKey = KeyBlock
+    bpy.types.Mesh = Mesh
+    bpy.types.Object = Object
+    bpy.types.Scene = Scene
+
+    registered = set()
+    bpy.utils = types.ModuleType("bpy.utils")
+    bpy.utils.register_class = functools.partial(_register_class, registered)
+    bpy.utils.unregister_class = registered.discard
+    bpy.utils.registered = registered
+
+    handlers = types.ModuleType("bpy.app.handlers")
+    handlers.persistent = lambda function: function
+    for name in ("depsgraph_update_post", "load_post", "undo_post", "redo_post",
+                 "frame_change_post", "save_pre"):
+        setattr(handlers, name, [])
+    bpy.app = types.ModuleType("bpy.app")
+    bpy.app.handlers = handlers
+    bpy.app.timers = Timers()
+    bpy.msgbus = MessageBus()
+    bpy.app.version = (4, 2, 0)
+    bpy.app.version_string = "fake"
+    bpy.app.binary_path = "blender"
+    bpy.app.background = True
+
+    bpy.data = types.SimpleNamespace(
+        objects=DataCollection(), meshes=DataCollection(), actions=DataCollection(),
+        filepath="")
+    bpy.ops = types.SimpleNamespace()
+    bpy.context = Context(Scene())
+
+    bpy_extras = types.ModuleType("bpy_extras")
+    io_utils = types.ModuleType("bpy_extras.io_utils")
+    io_utils.ExportHelper = _type("ExportHelper", object)
+    io_utils.ImportHelper = _type("ImportHelper", object)
+    bpy_extras.io_utils = io_utils
+
+    sys.modules.update({
+        "bpy": bpy,
+        "bpy.props": bpy.props,
+        "bpy.types": bpy.types,
+        "bpy.utils": bpy.utils,
+        "bpy.app": bpy.app,
+        "bpy.app.handlers": handlers,
+        "bpy_extras": bpy_extras,
+        "bpy_extras.io_utils": io_utils,
+    })
+    return bpy
+
+
+def make_scene(objects=1000, keys=50, overlap=0.8, linked=0.0, select=True):
+    """Fill the fake scene with mesh objects that have shape keys.
+
+    Every object gets `keys` shape keys (plus Basis); the first overlap * keys
+    names are shared by all objects. Every 1/linked-th object (if linked > 0)
+    reuses the previous object's mesh, like a linked duplicate.
+    """
+    bpy = sys.modules["bpy"]
+    scene = bpy.context.scene
+    shared = round(keys * overlap)
+    common_names = ["Basis"] + [f"Common_{i:04d}" for i in range(shared)]
+    link_every = round(1 / linked) if linked > 0 else 0
+
+    mesh = None
+    for i in range(objects):
+        name = f"Object_{i:06d}"
+        if not (mesh is not None and link_every and i % link_every):
+            key_names = common_names + [f"{name}_Key_{k:04d}" for k in range(keys - shared)]
+            mesh = Mesh(f"Mesh_{i:06d}", key_names)
+            bpy.data.meshes[mesh.name] = mesh
+        obj = Object(name, mesh)
+        obj.selected = select
+        bpy.data.objects[name] = obj
+        scene.objects.append(obj)
+
+    if scene.objects:
+        bpy.context.view_layer.objects.active = scene.objects[0]
+    return scene
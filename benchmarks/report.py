@@ -0,0 +1,75 @@
+"""Timing helpers and baseline comparison shared by the benchmark scripts.
+
+This module does not depend on bpy.
+"""
+import json
+import platform
+import statistics
+import time
+
+
+def measure(func, repeat=5, setup=None):
+    """Call func repeat times (after setup, if given) and return timing stats in seconds."""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {
+        "runs": len(times),
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+    }
+
+
+def make_report(params, results, environment=None):
+    env = {"python": platform.python_version(), "platform": platform.platform()}
+    env.update(environment or {})
+    return {"environment": env, "params": params, "results": results}
+
+
+def write_report(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def load_report(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(report, baseline, threshold):
+    """Compare the median times of two reports.
+
+    Returns a list of (name, baseline median, current median, ratio, ok) rows
+    for the benchmarks present in both. A benchmark fails when it is slower
+    than the baseline by more than threshold (0.2 = 20%).
+    """
+    if report.get("params") != baseline.get("params"):
+        print("warning: benchmark parameters differ from the baseline")
+
+    rows = []
+    for name, result in report["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        ratio = result["median"] / base["median"] if base["median"] > 0 else 1.0
+        rows.append((name, base["median"], result["median"], ratio, ratio <= 1.0 + threshold))
+    return rows
+
+
+def print_results(results):
+    width = max((len(name) for name in results), default=0)
+    for name, result in results.items():
+        print(f"{name:<{width}}  median {result['median'] * 1000:10.3f} ms  "
+              f"min {result['min'] * 1000:10.3f} ms  ({result['runs']} runs)")
+
+
+def print_comparison(rows):
+    width = max((len(row[0]) for row in rows), default=0)
+    for name, base, current, ratio, ok in rows:
+        print(f"{'ok  ' if ok else 'FAIL'} {name:<{width}}  {base * 1000:10.3f} ms -> "
+              f"{current * 1000:10.3f} ms  ({ratio:.2f}x)")
@@ -0,0 +1,284 @@
+"""Build a catalog of the shape key names in many .blend files.
+
+Run from a plain Python interpreter, in which case every file is read by a
+background Blender instance (see --blender and --jobs):
+
+    python catalog.py --catalog shapekeys.db --jobs 8 assets/*.blend
+
+or inside Blender:
+
+    blender --background --factory-startup --python catalog.py -- --catalog shapekeys.db a.blend b.blend
+
+The objects are only linked with bpy.data.libraries.load to read their
+object, mesh and shape key names, so the files are never opened in the UI.
+The catalog is an SQLite database of file -> object -> shape key names;
+files that did not change since they were last scanned are skipped. Query it
+with --list UNION / INTERSECTION (same semantics as the panel's list), or
+from the panel's "Check Catalog Coverage" button.
+"""
+import argparse
+import importlib
+import json
+import os
+import sqlite3
+import sys
+import time
+
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+if __package__:
+    from . import core
+else:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import core
+
+# ワーカーが標準出力に書き出す結果行の接頭辞
+RESULT_PREFIX = "MOS_CATALOG "
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT NOT NULL DEFAULT '',
+    scan_time REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS objects (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    mesh TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS keys (
+    object_id INTEGER NOT NULL REFERENCES objects(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS objects_file ON objects(file_id);
+CREATE INDEX IF NOT EXISTS objects_name ON objects(name);
+CREATE INDEX IF NOT EXISTS keys_object ON keys(object_id);
+CREATE INDEX IF NOT EXISTS keys_name ON keys(name);
+"""
+
+
+class Catalog:
+    """SQLite catalog of the shape key names of the mesh objects in .blend files."""
+
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def is_current(self, filepath):
+        """Tell whether a file was scanned without errors and has not changed since."""
+        filepath = os.path.abspath(filepath)
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return False
+        row = self.connection.execute(
+            "SELECT mtime, size, status FROM files WHERE path = ?", (filepath,)).fetchone()
+        return row is not None and row == (stat.st_mtime, stat.st_size, "OK")
+
+    def store(self, result):
+        """Replace the entries of a file with a scan result (see scan_file)."""
+        with self.connection:
+            self.connection.execute("DELETE FROM files WHERE path = ?", (result["file"],))
+            file_id = self.connection.execute(
+                "INSERT INTO files (path, mtime, size, status, error, scan_time) VALUES (?, ?, ?, ?, ?, ?)",
+                (result["file"], result["mtime"], result["size"], result["status"],
+                 result["error"], result["scan_time"])).lastrowid
+            for obj_name, mesh_name, key_names in result["objects"]:
+                object_id = self.connection.execute(
+                    "INSERT INTO objects (file_id, name, mesh) VALUES (?, ?, ?)",
+                    (file_id, obj_name, mesh_name)).lastrowid
+                self.connection.executemany(
+                    "INSERT INTO keys (object_id, position, name) VALUES (?, ?, ?)",
+                    [(object_id, i, name) for i, name in enumerate(key_names)])
+
+    def get_counts(self):
+        """Get the numbers of cataloged files and objects."""
+        files = self.connection.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        objects = self.connection.execute("SELECT COUNT(*) FROM objects").fetchone()[0]
+        return files, objects
+
+    def get_layouts(self):
+        """Get the distinct key layouts (see core.make_layout) of the cataloged objects."""
+        layouts = {}
+        names = []
+        current = None
+        rows = self.connection.execute("SELECT object_id, name FROM keys ORDER BY object_id, position")
+        for object_id, name in rows:
+            if object_id != current:
+                if names:
+                    layouts.setdefault(tuple(names), None)
+                current = object_id
+                names = []
+            names.append(name)
+        if names:
+            layouts.setdefault(tuple(names), None)
+        return [core.make_layout(names) for names in layouts]
+
+    def key_names(self, mode):
+        """Get the shape key names of all cataloged objects, as 'UNION' or 'INTERSECTION'."""
+        return core.combine_names(self.get_layouts(), mode)
+
+    def _query_names(self, names):
+        # 名前の一覧は一時テーブル経由で渡し、インデックスを使って結合する
+        self.connection.execute("CREATE TEMP TABLE IF NOT EXISTS query_names (name TEXT PRIMARY KEY)")
+        self.connection.execute("DELETE FROM query_names")
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO query_names (name) VALUES (?)", [(name,) for name in names])
+
+    def key_coverage(self, names):
+        """Get {shape key name: (objects, files)} counts of the cataloged objects and files that have each name."""
+        self._query_names(names)
+        rows = self.connection.execute(
+            "SELECT q.name, COUNT(DISTINCT k.object_id), COUNT(DISTINCT o.file_id) FROM query_names q "
+            "LEFT JOIN keys k ON k.name = q.name LEFT JOIN objects o ON o.id = k.object_id "
+            "GROUP BY q.name")
+        return {name: (objects, files) for name, objects, files in rows}
+
+    def object_files(self, names):
+        """Get {object name: [file paths]} for the cataloged objects with the given names."""
+        self._query_names(names)
+        result = {}
+        rows = self.connection.execute(
+            "SELECT o.name, f.path FROM query_names q JOIN objects o ON o.name = q.name "
+            "JOIN files f ON f.id = o.file_id ORDER BY o.name, f.path")
+        for name, path in rows:
+            result.setdefault(name, []).append(path)
+        return result
+
+
+def scan_file(filepath):
+    """Read the shape key names of the mesh objects of a .blend file (inside Blender).
+
+    Returns a result dict that can be stored with Catalog.store and sent
+    between processes as JSON.
+    """
+    filepath = os.path.abspath(filepath)
+    result = {"file": filepath, "mtime": 0.0, "size": 0, "status": "OK", "error": "",
+              "objects": [], "scan_time": 0.0}
+    start = time.perf_counter()
+    try:
+        stat = os.stat(filepath)
+        result.update(mtime=stat.st_mtime, size=stat.st_size)
+        with bpy.data.libraries.load(filepath, link=True) as (data_from, data_to):
+            data_to.objects = list(data_from.objects)
+
+        for obj in data_to.objects:
+            if obj is None or obj.type != 'MESH' or obj.data is None:
+                continue
+            shape_keys = obj.data.shape_keys
+            names = [block.name for block in shape_keys.key_blocks] if shape_keys else []
+            result["objects"].append([obj.name, obj.data.name, names])
+
+        # 次のファイルのためにリンクしたライブラリを削除してメモリを解放する
+        for library in list(bpy.data.libraries):
+            if os.path.normcase(os.path.abspath(bpy.path.abspath(library.filepath))) == os.path.normcase(filepath):
+                bpy.data.libraries.remove(library)
+    except Exception as e:
+        result.update(status="ERROR", error=str(e))
+    result["scan_time"] = time.perf_counter() - start
+    return result
+
+
+def import_batch():
+    """Import batch.py, whose background Blender worker pool is reused for scanning."""
+    if __package__:
+        return importlib.import_module(".batch", __package__)
+    import batch
+    return batch
+
+
+def build_worker_command(args, filepath):
+    return [
+        args.blender, "--background", "--factory-startup",
+        "--python", os.path.abspath(__file__), "--",
+        "--worker", os.path.abspath(filepath),
+    ]
+
+
+def run_worker(args, filepath):
+    """Scan one file in a separate background Blender."""
+    start = time.perf_counter()
+    result, returncode = import_batch().run_blender(build_worker_command(args, filepath), RESULT_PREFIX)
+    if result is not None:
+        return result
+    return {"file": os.path.abspath(filepath), "mtime": 0.0, "size": 0, "status": "ERROR",
+            "error": f"Blender exited with code {returncode} without a result",
+            "objects": [], "scan_time": time.perf_counter() - start}
+
+
+def iter_results(args, files):
+    """Scan the files and yield the result of each file as soon as it is done."""
+    if bpy is None or args.jobs > 1:
+        yield from import_batch().map_jobs(lambda filepath: run_worker(args, filepath), files, args.jobs)
+        return
+    for filepath in files:
+        yield scan_file(filepath)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="catalog.py", description="Build a catalog of the shape key names in .blend files.")
+    parser.add_argument("files", nargs="*", help=".blend files to scan")
+    parser.add_argument("--catalog", help="SQLite catalog file to update and query")
+    parser.add_argument("--force", action="store_true", help="Scan files again even if they did not change")
+    parser.add_argument("--list", choices=("UNION", "INTERSECTION"),
+                        help="Print the shape key names of all cataloged objects")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Number of background Blender instances to run in parallel")
+    parser.add_argument("--blender", default=bpy.app.binary_path if bpy else "blender",
+                        help="Blender executable used for parallel jobs")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    args = parse_args(argv)
+
+    if args.worker:
+        print(RESULT_PREFIX + json.dumps(scan_file(args.files[0]), ensure_ascii=False), flush=True)
+        return 0
+    if not args.catalog:
+        print("--catalog is required", file=sys.stderr)
+        return 2
+
+    failed = 0
+    with Catalog(args.catalog) as catalog:
+        files = [filepath for filepath in args.files if args.force or not catalog.is_current(filepath)]
+        for result in iter_results(args, files):
+            catalog.store(result)
+            if result["status"] != "OK":
+                failed += 1
+            keys = sum(len(names) for _, _, names in result["objects"])
+            print(f"[{result['status']}] {result['file']}: {len(result['objects'])} objects, "
+                  f"{keys} keys, {result['scan_time']:.3f}s {result['error']}", flush=True)
+        if len(files) < len(args.files):
+            print(f"Skipped {len(args.files) - len(files)} unchanged file(s)")
+
+        if args.list:
+            for name in catalog.key_names(args.list):
+                print(name)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
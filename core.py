@@ -0,0 +1,391 @@
+"""Shape key list, preset and snapshot algorithms that do not depend on bpy.
+
+The operators in __init__.py only gather names and values from Blender data
+and hand them to these functions, so the algorithms can be profiled and
+benchmarked in plain CPython.
+
+A key layout is a (names tuple, names frozenset) pair describing the shape
+keys of one shape key datablock, in key block order.
+"""
+import base64
+import gzip
+import json
+import os
+import re
+import struct
+import sys
+import zlib
+from array import array
+
+
+def make_layout(names):
+    """Make a key layout from a sequence of shape key names."""
+    names = tuple(names)
+    return names, frozenset(names)
+
+
+def combine_names(layouts, mode, ref_layout=None):
+    """Combine the names of several key layouts.
+
+    In 'UNION' mode all names are returned, in order of first appearance.
+    In 'INTERSECTION' mode the names that every layout has are returned, in
+    the order of ref_layout (or of the first layout if ref_layout is None).
+    """
+    if not layouts:
+        return []
+
+    if mode == 'UNION':
+        # 和集合 (Union):
+        # 選択されたオブジェクトを順に見ていき、各オブジェクトのシェイプキーの順序を尊重しつつ、
+        # まだリストにないシェイプキーを追加していく。
+        ordered_keys = []
+        seen_keys = set()
+        for names, name_set in layouts:
+            for name in names:
+                if name not in seen_keys:
+                    ordered_keys.append(name)
+                    seen_keys.add(name)
+        return ordered_keys
+
+    elif mode == 'INTERSECTION':
+        # 積集合 (Intersection):
+        # 1. 全ての対象オブジェクトに共通するシェイプキー名のセットを計算する。
+        #    共通するものがなくなった時点で打ち切る。
+        common_key_names = set(layouts[0][1])
+        for names, name_set in layouts[1:]:
+            common_key_names &= name_set
+            if not common_key_names:
+                return []
+
+        # 2. 順序を決定するため、参照オブジェクト（アクティブオブジェクト or 最初のオブジェクト）を決定する。
+        if ref_layout is None:
+            ref_layout = layouts[0]
+
+        # 3. 参照オブジェクトのシェイプキーの順序に基づき、共通シェイプキーをリスト化する。
+        return [name for name in ref_layout[0] if name in common_key_names]
+    raise ValueError(f'{mode} is not implemented')
+
+
+def plan_list_update(current, names):
+    """Plan the edits that turn the list of names `current` into `names`.
+
+    Returns (removals, additions, moves): the indices to remove, in descending
+    order, then the names to append, then the (from, to) moves to apply in
+    order. Entries that are already in place are left alone.
+    """
+    wanted = set(names)
+    removed = []
+    remaining = []
+    seen = set()
+    for i, name in enumerate(current):
+        if name in wanted and name not in seen:
+            remaining.append(name)
+            seen.add(name)
+        else:
+            removed.append(i)
+
+    additions = [name for name in names if name not in seen]
+    order = remaining + additions
+    moves = []
+    for i, name in enumerate(names):
+        if order[i] != name:
+            j = order.index(name, i + 1)
+            moves.append((j, i))
+            order.insert(i, order.pop(j))
+    return removed[::-1], additions, moves
+
+
+def missing_names(existing, candidates):
+    """Get the candidates that are not in existing, in order and without duplicates."""
+    seen = set(existing)
+    result = []
+    for name in candidates:
+        if name not in seen:
+            result.append(name)
+            seen.add(name)
+    return result
+
+
+def plan_set_update(current, names):
+    """Plan the edits that make the list of names `current` hold exactly `names`.
+
+    Unlike plan_list_update() the order is ignored: entries that stay are left
+    where they are and new names are appended. Returns (removals, additions),
+    the indices to remove in descending order (including duplicates) and the
+    names to append.
+    """
+    wanted = set(names)
+    removals = []
+    seen = set()
+    for i, name in enumerate(current):
+        if name in wanted and name not in seen:
+            seen.add(name)
+        else:
+            removals.append(i)
+    return removals[::-1], missing_names(seen, names)
+
+
+def match_names(names, pattern, use_regex=False):
+    """Tell which names match a list filter pattern, as a list of bools.
+
+    The match is a case-insensitive substring search, or re.search() with
+    use_regex. An empty pattern matches every name, and a pattern that is not
+    a valid regular expression is searched for literally.
+    """
+    if not pattern:
+        return [True] * len(names)
+    if use_regex:
+        try:
+            search = re.compile(pattern, re.IGNORECASE).search
+        except re.error:
+            search = re.compile(re.escape(pattern), re.IGNORECASE).search
+        return [search(name) is not None for name in names]
+    pattern = pattern.casefold()
+    return [pattern in name.casefold() for name in names]
+
+
+def sort_positions(keys, reverse=False):
+    """Get the new position of every item when the items are sorted by keys.
+
+    The sort is stable, and the result is in the format of UIList.filter_items'
+    new order (the result's i-th entry is where the i-th item is shown).
+    """
+    order = sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse)
+    positions = [0] * len(keys)
+    for position, index in enumerate(order):
+        positions[index] = position
+    return positions
+
+
+def find_empty_keys(displacements, tolerance):
+    """Get the names of the shape keys that have no visible effect anywhere.
+
+    displacements is an iterable of {name: largest vertex displacement} dicts,
+    one per shape key datablock. A name is empty if its displacement is at
+    most tolerance in every dict that has it. Names are returned in the order
+    they are first seen.
+    """
+    empty = {}
+    for entry in displacements:
+        for name, displacement in entry.items():
+            if displacement > tolerance:
+                empty[name] = False
+            else:
+                empty.setdefault(name, True)
+    return [name for name, is_empty in empty.items() if is_empty]
+
+
+# 左右を表す 1 文字と、名前の残りとの区切り文字
+_SIDE_SWAP = {'L': 'R', 'R': 'L', 'l': 'r', 'r': 'l'}
+_SIDE_SEPARATORS = "._- "
+_SIDE_WORDS = (("Left", "Right"), ("left", "right"), ("LEFT", "RIGHT"))
+
+
+def get_side(name):
+    """Get the side of a shape key name and the name of its opposite side.
+
+    Recognizes a single-letter side separated by . _ - or a space at the end
+    ("Smile_L", "Blink.R") or at the start ("L_Brow") of the name, and the
+    words Left / Right anywhere in it ("BrowLeftUp"). Returns a ('L' or 'R',
+    mirrored name) tuple, or None if the name has no side.
+    """
+    if len(name) >= 2:
+        if name[-1] in _SIDE_SWAP and name[-2] in _SIDE_SEPARATORS:
+            return name[-1].upper(), name[:-1] + _SIDE_SWAP[name[-1]]
+        if name[0] in _SIDE_SWAP and name[1] in _SIDE_SEPARATORS:
+            return name[0].upper(), _SIDE_SWAP[name[0]] + name[1:]
+    for left, right in _SIDE_WORDS:
+        if left in name:
+            return 'L', name.replace(left, right, 1)
+        if right in name:
+            return 'R', name.replace(right, left, 1)
+    return None
+
+
+def mirror_table(names):
+    """Pair the left and right side shape keys of a key layout.
+
+    Returns (left indices, right indices): the i-th left key is paired with
+    the i-th right key. Keys whose counterpart is not in names are left out.
+    """
+    positions = {}
+    for i, name in enumerate(names):
+        positions.setdefault(name, i)
+    left = []
+    right = []
+    for i, name in enumerate(names):
+        side = get_side(name)
+        if side is None or side[0] != 'L':
+            continue
+        j = positions.get(side[1])
+        if j is not None:
+            left.append(i)
+            right.append(j)
+    return left, right
+
+
+def parse_preset(data):
+    """Validate one preset of an exported preset file.
+
+    Returns a (name, object names, snapshots) tuple, where snapshots is a list
+    of (name, data) pairs. Raises ValueError for invalid data.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("preset must be an object")
+    name = data.get("name")
+    object_names = data.get("object_names")
+    if not name or not isinstance(name, str):
+        raise ValueError("preset has no name")
+    if not isinstance(object_names, list) or not all(isinstance(n, str) for n in object_names):
+        raise ValueError(f"preset '{name}' has no valid object_names list")
+
+    snapshots = []
+    for snapshot in data.get("snapshots") or []:
+        if isinstance(snapshot, dict) and isinstance(snapshot.get("data"), str):
+            snapshots.append((str(snapshot.get("name", "Snapshot")), snapshot["data"]))
+    return name, object_names, snapshots
+
+
+def unique_name(name, existing):
+    """Get a name that is not in the set `existing`, numbered like Blender does ("Name.001")."""
+    if name not in existing:
+        return name
+    base = name
+    number = 1
+    # 既に "Name.001" の形式なら番号を引き継ぐ
+    stem, dot, suffix = name.rpartition('.')
+    if dot and len(suffix) == 3 and suffix.isdigit():
+        base, number = stem, int(suffix) + 1
+    while f"{base}.{number:03d}" in existing:
+        number += 1
+    return f"{base}.{number:03d}"
+
+
+def write_presets(path, presets, compress=False):
+    """Write presets to a JSON Lines file, one preset per line, as they are generated.
+
+    presets is an iterable of (name, object names, snapshots) tuples in the
+    format of parse_preset(). With compress the file is gzip-compressed.
+    Returns the number of presets written.
+    """
+    opener = gzip.open if compress else open
+    count = 0
+    with opener(path, 'wt', encoding='utf-8', newline='\n') as f:
+        for name, object_names, snapshots in presets:
+            f.write(json.dumps({
+                "name": name,
+                "object_names": object_names,
+                "snapshots": [{"name": n, "data": d} for n, d in snapshots],
+            }, ensure_ascii=False, separators=(',', ':')))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def read_presets(path, errors):
+    """Read and validate presets from a file, yielding (progress, preset) pairs.
+
+    The file is either JSON Lines (one preset per line) or a JSON array as
+    written by older versions, optionally gzip-compressed (detected from the
+    content, not the extension). JSON Lines files are streamed. progress is
+    the fraction of the file read so far, and preset is a tuple as returned
+    by parse_preset(). Invalid presets are skipped, and a (position, message)
+    pair is appended to errors for each of them. Errors that make the whole
+    file unreadable (I/O errors, broken compression, or an invalid JSON
+    array) are raised.
+    """
+    size = os.path.getsize(path) or 1
+    with open(path, 'rb') as raw:
+        compressed = raw.read(2) == b'\x1f\x8b'
+        raw.seek(0)
+        reader = gzip.GzipFile(fileobj=raw) if compressed else raw
+
+        first = reader.peek(64)[:64].lstrip(b'\xef\xbb\xbf \t\r\n')
+        if first.startswith(b'['):
+            # 旧形式 (JSON 配列) はまとめて読み込む
+            data = json.loads(reader.read().decode('utf-8-sig'))
+            for i, preset_data in enumerate(data):
+                try:
+                    yield (i + 1) / len(data), parse_preset(preset_data)
+                except ValueError as e:
+                    errors.append((i + 1, str(e)))
+            return
+
+        for line_number, line in enumerate(reader, 1):
+            if line_number == 1:
+                line = line.lstrip(b'\xef\xbb\xbf')
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                preset = parse_preset(json.loads(line.decode('utf-8')))
+            except ValueError as e:
+                # json.JSONDecodeError と UnicodeDecodeError も ValueError の派生
+                errors.append((line_number, str(e)))
+                continue
+            yield raw.tell() / size, preset
+
+
+def float32_bytes(values):
+    """Get the little-endian float32 bytes of a sequence or float32 buffer."""
+    try:
+        view = memoryview(values)
+    except TypeError:
+        view = None
+    if view is not None and view.format == 'f' and view.c_contiguous:
+        packed = array('f')
+        packed.frombytes(view.tobytes())
+    else:
+        packed = array('f', values)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def pack_snapshot(entries):
+    """Pack (object name, key names, values) entries into an ASCII string.
+
+    Objects with the same key layout share one name table, and all values are
+    stored as a single float32 array. The result is zlib-compressed and base64
+    encoded so that it can be kept in a StringProperty.
+    """
+    layout_indices = {}
+    layouts = []
+    objects = []
+    chunks = []
+    for obj_name, names, values in entries:
+        names = tuple(names)
+        index = layout_indices.get(names)
+        if index is None:
+            index = layout_indices[names] = len(layouts)
+            layouts.append(names)
+        objects.append((obj_name, index))
+        chunks.append(float32_bytes(values))
+
+    header = json.dumps(
+        {"version": 1, "layouts": layouts, "objects": objects}, ensure_ascii=False).encode('utf-8')
+    blob = struct.pack('<I', len(header)) + header + b"".join(chunks)
+    return base64.b64encode(zlib.compress(blob)).decode('ascii')
+
+
+def unpack_snapshot(data):
+    """Unpack a string made by pack_snapshot into (object name, key names, values) entries.
+
+    The values are float32 arrays (array.array('f')).
+    """
+    blob = zlib.decompress(base64.b64decode(data))
+    (header_size,) = struct.unpack_from('<I', blob)
+    header = json.loads(blob[4:4 + header_size].decode('utf-8'))
+    values = array('f')
+    values.frombytes(blob[4 + header_size:])
+    if sys.byteorder == 'big':
+        values.byteswap()
+
+    layouts = [tuple(names) for names in header["layouts"]]
+    entries = []
+    offset = 0
+    for obj_name, index in header["objects"]:
+        names = layouts[index]
+        entries.append((obj_name, names, values[offset:offset + len(names)]))
+        offset += len(names)
+    return entries
@@ -0,0 +1,362 @@
+"""Receive shape key values over UDP for live previews (e.g. face capture).
+
+Every datagram is one frame of {shape key name: value}, either as JSON
+
+    {"Smile": 0.5, "Blink_L": 1.0}
+    {"time": 1700000000.123, "values": {"Smile": 0.5}}
+
+or as OSC: a message "/mos ,sfsf Smile 0.5 Blink_L 1.0" with name / value
+pairs, messages "/mos/Smile ,f 0.5" with the name in the address, or a bundle
+of such messages. "time" (or the bundle's time tag) is the sender's
+time.time() and is used to measure the end-to-end latency.
+
+The Listener reads on a background thread and keeps only the latest frame:
+the consumer (a bpy.app.timers callback in the addon) takes it without
+waiting, and frames that were overwritten before being taken are counted as
+dropped. This module does not use bpy; run it as a script to send a test
+stream to a listener on this machine:
+
+    python live.py --port 9001 --rate 60 --format osc Smile Blink_L Blink_R
+"""
+import argparse
+import collections
+import json
+import math
+import socket
+import struct
+import sys
+import threading
+import time
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 9001
+# 1 フレームとして受け付ける UDP データグラムの最大サイズ
+MAX_DATAGRAM = 65507
+# OSC のタイムタグ (1900 年起点) と UNIX 時刻の差 (秒)
+NTP_EPOCH_OFFSET = 2208988800
+OSC_ADDRESS = "/mos"
+# 入れ子になった OSC バンドルの最大の深さ
+MAX_BUNDLE_DEPTH = 8
+# stop() が受信スレッドの終了を待つ最大の時間 (秒)
+STOP_TIMEOUT = 0.2
+
+
+class FrameError(ValueError):
+    """A datagram that is not a valid frame."""
+
+
+def parse_json_frame(data):
+    """Decode a JSON frame into ({name: value}, sender time or None)."""
+    try:
+        frame = json.loads(data.decode('utf-8'))
+    except (UnicodeDecodeError, ValueError) as e:
+        raise FrameError(f"Invalid JSON frame: {e}") from None
+    if not isinstance(frame, dict):
+        raise FrameError("A JSON frame must be an object")
+    sent = None
+    if isinstance(frame.get("values"), dict):
+        sent = frame.get("time")
+        frame = frame["values"]
+    try:
+        values = {str(name): float(value) for name, value in frame.items()}
+        sent = float(sent) if sent is not None else None
+    except (TypeError, ValueError, OverflowError):
+        raise FrameError("Frame values must be numbers") from None
+    if not all(map(math.isfinite, values.values())):
+        raise FrameError("Frame values must be finite")
+    return values, sent
+
+
+def _read_osc_string(data, offset):
+    end = data.find(b'\0', offset)
+    if end < 0:
+        raise FrameError("Unterminated OSC string")
+    text = data[offset:end].decode('utf-8', 'replace')
+    # 文字列は終端の NUL を含めて 4 バイト境界まで埋められる
+    return text, (end + 4) & ~3
+
+
+def _read_osc_message(data, values):
+    address, offset = _read_osc_string(data, 0)
+    tags, offset = _read_osc_string(data, offset)
+    if not tags.startswith(','):
+        raise FrameError("Missing OSC type tags")
+    arguments = []
+    for tag in tags[1:]:
+        if tag in 'if':
+            if offset + 4 > len(data):
+                raise FrameError("Truncated OSC argument")
+            arguments.append(struct.unpack_from('>i' if tag == 'i' else '>f', data, offset)[0])
+            offset += 4
+        elif tag == 'd':
+            if offset + 8 > len(data):
+                raise FrameError("Truncated OSC argument")
+            arguments.append(struct.unpack_from('>d', data, offset)[0])
+            offset += 8
+        elif tag == 's':
+            text, offset = _read_osc_string(data, offset)
+            arguments.append(text)
+        else:
+            raise FrameError(f"Unsupported OSC type tag {tag!r}")
+
+    if address == OSC_ADDRESS:
+        # "/mos" 名前, 値, 名前, 値, ...
+        for name, value in zip(arguments[::2], arguments[1::2]):
+            if isinstance(name, str) and not isinstance(value, str):
+                values[name] = float(value)
+    elif address.startswith(OSC_ADDRESS + "/") and len(arguments) == 1 and not isinstance(arguments[0], str):
+        # "/mos/名前" 値
+        values[address[len(OSC_ADDRESS) + 1:]] = float(arguments[0])
+
+
+def _read_osc_bundle(data, values, depth=0):
+    if depth >= MAX_BUNDLE_DEPTH:
+        raise FrameError("OSC bundles are nested too deeply")
+    if len(data) < 16:
+        raise FrameError("Truncated OSC bundle")
+    seconds, fraction = struct.unpack_from('>II', data, 8)
+    offset = 16
+    while offset + 4 <= len(data):
+        size = struct.unpack_from('>i', data, offset)[0]
+        offset += 4
+        element = data[offset:offset + size]
+        if size <= 0 or len(element) != size:
+            raise FrameError("Truncated OSC bundle element")
+        if element.startswith(b'#bundle\0'):
+            _read_osc_bundle(element, values, depth + 1)
+        else:
+            _read_osc_message(element, values)
+        offset += size
+    # タイムタグ 1 は「即時」を表し、送信時刻を持たない
+    if (seconds, fraction) == (0, 1):
+        return None
+    return seconds - NTP_EPOCH_OFFSET + fraction / 2 ** 32
+
+
+def parse_osc_frame(data):
+    """Decode an OSC message or bundle into ({name: value}, sender time or None)."""
+    values = {}
+    try:
+        if data.startswith(b'#bundle\0'):
+            return values, _read_osc_bundle(data, values)
+        _read_osc_message(data, values)
+        return values, None
+    except struct.error as e:
+        raise FrameError(f"Invalid OSC frame: {e}") from None
+
+
+def parse_frame(data):
+    """Decode a JSON or OSC datagram into ({name: value}, sender time or None).
+
+    Raises FrameError for anything that is not a valid frame.
+    """
+    try:
+        if data.startswith(b'/') or data.startswith(b'#bundle\0'):
+            values, sent = parse_osc_frame(data)
+            if not all(map(math.isfinite, values.values())):
+                raise FrameError("Frame values must be finite")
+            return values, sent
+        return parse_json_frame(data)
+    except (OverflowError, RecursionError, MemoryError) as e:
+        # 極端に大きな数値や深い入れ子の JSON で受信スレッドが止まらないようにする
+        raise FrameError(f"Invalid frame: {type(e).__name__}") from None
+
+
+def _osc_string(text):
+    data = text.encode('utf-8') + b'\0'
+    return data + b'\0' * (-len(data) % 4)
+
+
+def encode_osc_frame(values, sent=None):
+    """Encode {name: value} as an OSC bundle holding one "/mos" message."""
+    message = _osc_string(OSC_ADDRESS) + _osc_string("," + "sf" * len(values))
+    for name, value in values.items():
+        message += _osc_string(name) + struct.pack('>f', value)
+    if sent is None:
+        timetag = struct.pack('>II', 0, 1)
+    else:
+        seconds = sent + NTP_EPOCH_OFFSET
+        timetag = struct.pack('>II', int(seconds), int((seconds % 1) * 2 ** 32))
+    return b'#bundle\0' + timetag + struct.pack('>i', len(message)) + message
+
+
+def encode_json_frame(values, sent=None):
+    """Encode {name: value} as a JSON frame."""
+    frame = values if sent is None else {"time": sent, "values": values}
+    return json.dumps(frame, ensure_ascii=False).encode('utf-8')
+
+
+class LiveStats:
+    """Frame counters and latencies of a Listener.
+
+    Each counter is written by only one thread (received / errors by the
+    receiver, applied by the consumer), so no lock is needed; dropped frames
+    are derived from them.
+    """
+
+    def __init__(self, samples=600):
+        self.received = 0
+        self.errors = 0
+        self.applied = 0
+        self.queue_latency = collections.deque(maxlen=samples)
+        self.total_latency = collections.deque(maxlen=samples)
+
+    def get_dropped(self, pending):
+        return max(0, self.received - self.applied - pending)
+
+    @staticmethod
+    def _summary(samples):
+        if not samples:
+            return 0.0, 0.0
+        values = list(samples)
+        return sum(values) / len(values) * 1000, max(values) * 1000
+
+    def get_summary(self, pending=0):
+        """Get a dict of the counters and the mean / max latencies in milliseconds."""
+        queue_mean, queue_max = self._summary(self.queue_latency)
+        total_mean, total_max = self._summary(self.total_latency)
+        return {
+            "received": self.received,
+            "applied": self.applied,
+            "dropped": self.get_dropped(pending),
+            "errors": self.errors,
+            "queue_latency_ms": queue_mean,
+            "queue_latency_max_ms": queue_max,
+            "total_latency_ms": total_mean,
+            "total_latency_max_ms": total_max,
+        }
+
+
+class Listener:
+    """UDP listener that keeps only the latest frame for a consumer.
+
+    start() binds the socket and starts the receiving thread; poll() returns
+    the newest unread frame or None and never blocks.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.host = host
+        self.port = port
+        self.stats = LiveStats()
+        # deque の append / pop はスレッドセーフなので、ロックなしで最新のフレームだけを受け渡せる
+        self.latest = collections.deque(maxlen=1)
+        self.socket = None
+        self.thread = None
+        self.stopping = threading.Event()
+        self.error = ""
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        """Bind the socket and start receiving. Raises OSError if the port cannot be bound."""
+        if self.running:
+            return
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.bind((self.host, self.port))
+        except OSError:
+            sock.close()
+            raise
+        # 停止要求を確認できるように、受信は短いタイムアウトで待つ
+        sock.settimeout(0.1)
+        self.port = sock.getsockname()[1]
+        self.socket = sock
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self._receive, name="mos-live-listener", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop receiving without blocking the caller for more than STOP_TIMEOUT seconds."""
+        self.stopping.set()
+        if self.socket is not None:
+            # 先にソケットを閉じて、受信待ちの recv をすぐに戻らせる
+            try:
+                self.socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.socket.close()
+            self.socket = None
+        if self.thread is not None:
+            # 終わらなくても停止要求は出してあるので、daemon スレッドは次のタイムアウトで終わる
+            self.thread.join(STOP_TIMEOUT)
+            self.thread = None
+
+    def _receive(self):
+        sock = self.socket
+        while not self.stopping.is_set():
+            try:
+                data = sock.recv(MAX_DATAGRAM)
+            except socket.timeout:
+                continue
+            except OSError as e:
+                # stop() でソケットを閉じたときのエラーは報告しない
+                if not self.stopping.is_set():
+                    self.error = str(e)
+                return
+            if self.stopping.is_set():
+                return
+            received = time.time()
+            try:
+                values, sent = parse_frame(data)
+            except Exception as e:
+                # どんなデータを受け取っても受信スレッドは止めない
+                self.stats.errors += 1
+                self.error = str(e)
+                continue
+            self.stats.received += 1
+            self.latest.append((values, sent, received))
+
+    def poll(self):
+        """Take the latest unread frame as {name: value}, or None if there is none."""
+        try:
+            values, sent, received = self.latest.pop()
+        except IndexError:
+            return None
+        now = time.time()
+        self.stats.applied += 1
+        self.stats.queue_latency.append(now - received)
+        if sent is not None:
+            self.stats.total_latency.append(now - sent)
+        return values
+
+    def get_summary(self):
+        return self.stats.get_summary(len(self.latest))
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="live.py", description="Send a test stream of shape key values to a live listener.")
+    parser.add_argument("names", nargs="+", help="Shape key names to animate")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Listener host")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Listener port")
+    parser.add_argument("--rate", type=float, default=60.0, help="Frames per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to send")
+    parser.add_argument("--format", choices=("json", "osc"), default="json", help="Frame encoding")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    encode = encode_osc_frame if args.format == "osc" else encode_json_frame
+    frames = int(args.duration * args.rate)
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        start = time.perf_counter()
+        for frame in range(frames):
+            # キーごとに位相をずらした正弦波を送る
+            t = frame / args.rate
+            values = {
+                name: 0.5 + 0.5 * math.sin(2 * math.pi * (t + i / len(args.names)))
+                for i, name in enumerate(args.names)
+            }
+            sock.sendto(encode(values, time.time()), (args.host, args.port))
+            delay = start + (frame + 1) / args.rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    print(f"Sent {frames} frame(s) to {args.host}:{args.port}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""Shared fixtures: import paths for the bpy-free modules, and the addon on the fake bpy.
+
+core.py and live.py are imported as top-level modules. The addon itself is
+imported against benchmarks/fake_bpy.py, like benchmarks/core_bench.py does.
+The fake bpy is installed when this file is loaded, since pytest imports the
+addon's __init__.py as the package of the tests before any fixture runs.
+"""
+import importlib
+import os
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PACKAGE_DIR = os.path.dirname(TESTS_DIR)
+sys.path[:0] = [PACKAGE_DIR, os.path.join(PACKAGE_DIR, "benchmarks")]
+
+import fake_bpy  # noqa: E402
+
+fake_bpy.install()
+sys.path.insert(0, os.path.dirname(PACKAGE_DIR))
+
+
+@pytest.fixture(scope="session")
+def addon():
+    """The addon, imported and registered against the fake bpy."""
+    module = importlib.import_module(os.path.basename(PACKAGE_DIR))
+    module.register()
+    yield module
+    module.unregister()
+
+
+@pytest.fixture
+def scene(addon):
+    """An empty fake scene; call make_scene() on it with fake_bpy.make_scene()'s arguments."""
+    bpy = sys.modules["bpy"]
+    bpy.data.objects.clear()
+    bpy.data.meshes.clear()
+    bpy.context.scene.objects.clear()
+    bpy.context.view_layer.objects.active = None
+    # ファイルを読み込み直したときと同じように、前のテストのキャッシュを捨てる
+    addon.on_file_changed()
+    return bpy.context.scene
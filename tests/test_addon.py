@@ -0,0 +1,173 @@
+import sys
+import types
+
+import fake_bpy
+
+
+def depsgraph(*ids):
+    return types.SimpleNamespace(
+        updates=[types.SimpleNamespace(id=id_data, is_updated_geometry=False) for id_data in ids])
+
+
+def test_classes_register(addon):
+    # 登録時にコールバックの引数の数が確認されるので、profiled で包んだメソッドも登録できること
+    bpy = sys.modules["bpy"]
+    assert set(addon.classesToRegister) <= bpy.utils.registered
+    assert addon.PROPERTIES_OT_UnbindMaster.execute.__code__.co_argcount == 2
+
+
+def test_value_update_keeps_names(addon, scene):
+    fake_bpy.make_scene(objects=2, keys=4)
+    shape_keys = addon.get_shape_keys(scene.objects[0])
+    layout = addon.shapekey_names.get(shape_keys)
+
+    addon.write_key_values(shape_keys, [0.5] * len(shape_keys.key_blocks))
+    addon.on_depsgraph_update(scene, depsgraph(shape_keys, scene.objects[0], scene))
+    assert shape_keys.updates == 1
+    assert addon.shapekey_names.get(shape_keys) is layout
+
+
+def test_same_size_selection_change_drops_index(addon, scene):
+    bpy = sys.modules["bpy"]
+    fake_bpy.make_scene(objects=4, keys=4, select=False)
+    objects = scene.objects
+    for obj in objects[:2]:
+        obj.selected = True
+    addon.shapekey_index.build(bpy.context)
+
+    # アクティブオブジェクトを変えずに、同じ数の別のオブジェクトを選択する (ボックス選択など)
+    for obj in objects:
+        obj.selected = obj in objects[2:]
+    addon.on_depsgraph_update(scene, depsgraph(scene))
+    addon.write_values(bpy.context, {"Common_0000": 0.75})
+
+    values = [addon.get_shape_keys(obj).key_blocks["Common_0000"].value for obj in objects]
+    assert values == [0.0, 0.0, 0.75, 0.75]
+
+
+def test_added_key_drops_names(addon, scene):
+    fake_bpy.make_scene(objects=1, keys=4)
+    shape_keys = addon.get_shape_keys(scene.objects[0])
+    addon.shapekey_names.get(shape_keys)
+
+    shape_keys.key_blocks.blocks.append(fake_bpy.KeyBlock("Added"))
+    assert addon.shapekey_names.validate_updates(depsgraph(shape_keys).updates)
+    assert "Added" in addon.shapekey_names.get(shape_keys)[1]
+
+
+def test_renamed_key_drops_names(addon, scene):
+    bpy = sys.modules["bpy"]
+    fake_bpy.make_scene(objects=1, keys=4)
+    shape_keys = addon.get_shape_keys(scene.objects[0])
+    addon.shapekey_names.get(shape_keys)
+
+    shape_keys.key_blocks[1].name = "Renamed"
+    bpy.msgbus.publish((bpy.types.ShapeKey, "name"))
+    assert addon.shapekey_names.get(shape_keys)[0][1] == "Renamed"
+
+
+def test_snapshot_follows_renamed_object(addon, scene):
+    bpy = sys.modules["bpy"]
+    fake_bpy.make_scene(objects=2, keys=4)
+    data, captured = addon.capture_snapshot(scene.objects)
+    snapshot = addon.MOS_ValueSnapshot()
+    snapshot.data = data
+    for obj in captured:
+        reference = snapshot.objects.add()
+        reference.name = obj.name
+        reference.object = obj
+
+    obj = scene.objects[0]
+    del bpy.data.objects[obj.name]
+    obj.name = "Renamed"
+    bpy.data.objects[obj.name] = obj
+    shape_keys = addon.get_shape_keys(obj)
+    shape_keys.key_blocks[1].value = 1.0
+
+    assert addon.restore_snapshot(snapshot) == (2, [])
+    assert shape_keys.key_blocks[1].value == 0.0
+    assert addon.get_snapshot_data(snapshot) != data
+
+
+def run_import(addon, path, overwrite):
+    bpy = sys.modules["bpy"]
+    operator = addon.MOS_OT_ImportPresets()
+    operator.filepath = str(path)
+    operator.overwrite = overwrite
+    operator.merge = 'SKIP'
+    operator.reports = []
+    operator.report = lambda kind, message: operator.reports.append((kind, message))
+    return operator.execute(bpy.context)
+
+
+def test_failed_import_keeps_presets(addon, scene, tmp_path):
+    bpy = sys.modules["bpy"]
+    settings = addon.get_settings(bpy.context)
+    settings.presets.clear()
+    settings.presets.add().name = "Existing"
+
+    invalid = tmp_path / "invalid.json"
+    invalid.write_text("[{", encoding="utf-8")
+    for path in (tmp_path / "missing.jsonl", invalid):
+        assert run_import(addon, path, overwrite=True) == {'CANCELLED'}
+        assert [preset.name for preset in settings.presets] == ["Existing"]
+
+    valid = tmp_path / "presets.jsonl"
+    valid.write_text('{"name": "Imported", "object_names": []}\n', encoding="utf-8")
+    assert run_import(addon, valid, overwrite=True) == {'FINISHED'}
+    assert [preset.name for preset in settings.presets] == ["Imported"]
+
+
+def test_find_empty_keys_skips_edit_mode(addon, scene):
+    bpy = sys.modules["bpy"]
+    fake_bpy.make_scene(objects=2, keys=4)
+    for obj in scene.objects:
+        obj.mode = 'EDIT'
+    operator = addon.PROPERTIES_OT_FindEmptyShapekeys()
+    operator.tolerance = 1e-5
+    operator.action = 'REMOVE'
+    reports = []
+    operator.report = lambda kind, message: reports.append(message)
+
+    # 編集モードのキーブロックは読まれない (fake の KeyBlock は座標を持たないので、読むと失敗する)
+    assert operator.execute(bpy.context) == {'FINISHED'}
+    assert reports == ["No empty shape keys on the selected objects (skipped 2 object(s) in edit mode)"]
+
+
+def test_preset_duplicates_keep_index(addon, scene, tmp_path):
+    bpy = sys.modules["bpy"]
+    fake_bpy.make_scene(objects=2, keys=2)
+    path = tmp_path / "presets.jsonl"
+    path.write_text(
+        '{"name": "Face", "object_names": ["Object_000000", "Object_000001", "Object_000000", "Missing", "Missing"]}\n',
+        encoding="utf-8")
+    settings = addon.get_settings(bpy.context)
+    assert run_import(addon, path, overwrite=True) == {'FINISHED'}
+
+    preset = settings.presets[0]
+    assert [item.name for item in preset.object_names] == ["Object_000000", "Object_000001", "Missing"]
+    index = addon.preset_members.get(preset)
+    assert addon.preset_members.get(preset) is index
+    assert not preset.add_object("Object_000001", scene.objects[1])
+    assert addon.preset_members.get(preset) is index
+
+    # 古いファイルの重複は、インデックスを毎回作り直させない
+    preset.object_names.add().name = "Missing"
+    index = addon.preset_members.get(preset)
+    assert addon.preset_members.get(preset) is index
+    assert preset.find_object(scene.objects[0]) == 0
+
+
+def test_migration_drops_duplicates(addon, scene):
+    bpy = sys.modules["bpy"]
+    fake_bpy.make_scene(objects=2, keys=2)
+    settings = addon.get_settings(bpy.context)
+    settings.presets.clear()
+    preset = settings.presets.add()
+    for name, obj in (("Object_000000", scene.objects[0]), ("Object_000000", None), ("Object_000001", None)):
+        item = preset.object_names.add()
+        item.name = name
+        item.object = obj
+
+    assert addon.migrate_presets([scene]) == 2
+    assert [item.object for item in preset.object_names] == scene.objects[:2]
@@ -0,0 +1,134 @@
+import gzip
+import json
+
+import pytest
+
+import core
+
+
+def apply_list_plan(current, plan):
+    removals, additions, moves = plan
+    result = list(current)
+    for i in removals:
+        del result[i]
+    result.extend(additions)
+    for i, j in moves:
+        result.insert(j, result.pop(i))
+    return result
+
+
+@pytest.mark.parametrize("current, names", [
+    ([], ["A", "B"]),
+    (["A", "B", "C"], []),
+    (["A", "B", "C"], ["C", "A", "B"]),
+    (["A", "X", "B", "A"], ["B", "C", "A"]),
+    (["A", "B", "C", "D"], ["A", "C", "B", "D", "E"]),
+])
+def test_plan_list_update(current, names):
+    assert apply_list_plan(current, core.plan_list_update(current, names)) == names
+
+
+def test_plan_list_update_unchanged():
+    names = ["Basis", "Smile", "Blink"]
+    assert core.plan_list_update(names, names) == ([], [], [])
+
+
+def test_plan_set_update():
+    removals, additions = core.plan_set_update(["A", "X", "B", "A"], ["B", "C", "A"])
+    assert removals == [3, 1]
+    assert additions == ["C"]
+
+    result = ["A", "X", "B", "A"]
+    for i in removals:
+        del result[i]
+    assert result + additions == ["A", "B", "C"]
+
+
+def test_mirror_table():
+    names = ["Basis", "Smile_L", "Smile_R", "Blink.L", "L_Brow", "R_Brow", "BrowLeftUp", "BrowRightUp", "Wink_L"]
+    left, right = core.mirror_table(names)
+    assert list(zip(left, right)) == [(1, 2), (4, 5), (6, 7)]
+
+
+def test_mirror_table_duplicates_use_first():
+    left, right = core.mirror_table(["Smile_L", "Smile_R", "Smile_R"])
+    assert (left, right) == ([0], [1])
+
+
+@pytest.mark.parametrize("name, existing, expected", [
+    ("Preset", set(), "Preset"),
+    ("Preset", {"Preset"}, "Preset.001"),
+    ("Preset", {"Preset", "Preset.001", "Preset.002"}, "Preset.003"),
+    ("Preset.004", {"Preset.004"}, "Preset.005"),
+    ("Preset.x", {"Preset.x"}, "Preset.x.001"),
+])
+def test_unique_name(name, existing, expected):
+    assert core.unique_name(name, existing) == expected
+
+
+def test_snapshot_round_trip():
+    entries = [
+        ("Body", ("Basis", "Smile"), [0.0, 0.5]),
+        ("Face", ("Basis", "Smile"), [0.0, 0.25]),
+        ("Eyes", ("Basis", "Blink_L", "Blink_R"), [0.0, 1.0, 0.125]),
+    ]
+    data = core.pack_snapshot(entries)
+    assert data.isascii()
+
+    unpacked = core.unpack_snapshot(data)
+    assert [(obj_name, names, list(values)) for obj_name, names, values in unpacked] == entries
+
+
+def test_snapshot_empty():
+    assert core.unpack_snapshot(core.pack_snapshot([])) == []
+
+
+PRESETS = [
+    ("Face", ["Body", "Eyes"], [("Smile", "data")]),
+    ("Hands", ["Hand_L", "Hand_R"], []),
+]
+
+
+def read_all(path):
+    errors = []
+    presets = [preset for progress, preset in core.read_presets(path, errors)]
+    return presets, errors
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_read_presets_round_trip(tmp_path, compress):
+    path = tmp_path / "presets.jsonl"
+    assert core.write_presets(path, PRESETS, compress) == len(PRESETS)
+    assert read_all(path) == (PRESETS, [])
+
+
+def test_read_presets_legacy_array(tmp_path):
+    path = tmp_path / "presets.json"
+    path.write_text(json.dumps([
+        {"name": "Face", "object_names": ["Body", "Eyes"], "snapshots": [{"name": "Smile", "data": "data"}]},
+        {"name": "", "object_names": []},
+    ]), encoding="utf-8")
+    presets, errors = read_all(path)
+    assert presets == PRESETS[:1]
+    assert [position for position, message in errors] == [2]
+
+
+def test_read_presets_reports_invalid_lines(tmp_path):
+    path = tmp_path / "presets.jsonl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write('﻿{"name": "Face", "object_names": ["Body", "Eyes"], "snapshots": [{"name": "Smile", "data": "data"}]}\n')
+        f.write("not json\n")
+        f.write("\n")
+        f.write('{"name": "Bad", "object_names": "Body"}\n')
+        f.write('{"name": "Hands", "object_names": ["Hand_L", "Hand_R"]}\n')
+    presets, errors = read_all(path)
+    assert presets == PRESETS
+    assert [position for position, message in errors] == [2, 4]
+
+
+def test_read_presets_progress(tmp_path):
+    path = tmp_path / "presets.jsonl"
+    core.write_presets(path, PRESETS)
+    progress = [progress for progress, preset in core.read_presets(path, [])]
+    assert progress == sorted(progress)
+    assert progress[-1] == pytest.approx(1.0)
@@ -0,0 +1,117 @@
+import json
+import math
+import socket
+import struct
+import time
+
+import pytest
+
+import live
+
+
+def osc_message(address, tags, *arguments):
+    data = live._osc_string(address) + live._osc_string(tags)
+    for argument in arguments:
+        data += live._osc_string(argument) if isinstance(argument, str) else struct.pack('>f', argument)
+    return data
+
+
+def osc_bundle(*elements):
+    data = b'#bundle\0' + struct.pack('>II', 0, 1)
+    for element in elements:
+        data += struct.pack('>i', len(element)) + element
+    return data
+
+
+def test_json_frame():
+    assert live.parse_frame(b'{"Smile": 0.5, "Blink_L": 1}') == ({"Smile": 0.5, "Blink_L": 1.0}, None)
+
+
+def test_json_frame_with_time():
+    data = json.dumps({"time": 1700000000.5, "values": {"Smile": 0.25}}).encode()
+    assert live.parse_frame(data) == ({"Smile": 0.25}, 1700000000.5)
+
+
+def test_encoded_frames_round_trip():
+    values = {"Smile": 0.5, "Blink_L": 1.0}
+    assert live.parse_frame(live.encode_json_frame(values, 1700000000.5)) == (values, 1700000000.5)
+
+    parsed, sent = live.parse_frame(live.encode_osc_frame(values, 1700000000.5))
+    assert parsed == values
+    assert sent == pytest.approx(1700000000.5, abs=1e-6)
+    assert live.parse_frame(live.encode_osc_frame(values)) == (values, None)
+
+
+def test_osc_messages():
+    assert live.parse_frame(osc_message("/mos", ",sfsf", "Smile", 0.5, "Blink_L", 1.0)) == (
+        {"Smile": 0.5, "Blink_L": 1.0}, None)
+    assert live.parse_frame(osc_message("/mos/Smile", ",f", 0.5)) == ({"Smile": 0.5}, None)
+    # 他のアドレスのメッセージは無視する
+    assert live.parse_frame(osc_message("/other", ",f", 0.5)) == ({}, None)
+
+
+def test_osc_nested_bundle():
+    data = osc_bundle(osc_message("/mos/Smile", ",f", 0.5), osc_bundle(osc_message("/mos/Blink_L", ",f", 1.0)))
+    assert live.parse_frame(data) == ({"Smile": 0.5, "Blink_L": 1.0}, None)
+
+
+def nested_bundle(depth):
+    data = osc_message("/mos/Smile", ",f", 0.5)
+    for _ in range(depth):
+        data = osc_bundle(data)
+    return data
+
+
+@pytest.mark.parametrize("data", [
+    b'{"Smile": ',
+    b'[0.5]',
+    b'{"Smile": "high"}',
+    b'{"Smile": NaN}',
+    b'{"Smile": 1e999}',
+    b'{"Smile": 1' + b'0' * 400 + b'}',
+    b'[' * 100000 + b']' * 100000,
+    b'\xff\xfe',
+    osc_message("/mos", ",sf", "Smile", math.inf),
+    osc_message("/mos", ",sx", "Smile"),
+    osc_message("/mos", ",f"),
+    b'/mos',
+    b'#bundle\0',
+    osc_bundle(b'/mos\0\0\0\0,f\0\0')[:-2],
+    nested_bundle(live.MAX_BUNDLE_DEPTH + 1),
+], ids=lambda data: repr(data[:24]))
+def test_invalid_frames(data):
+    with pytest.raises(live.FrameError):
+        live.parse_frame(data)
+
+
+def test_listener_keeps_latest_frame():
+    listener = live.Listener(port=0)
+    listener.start()
+    thread = listener.thread
+    try:
+        frames = [
+            live.encode_json_frame({"Smile": 0.25}),
+            live.encode_osc_frame({"Smile": 0.5}),
+            b'garbage',
+            live.encode_json_frame({"Smile": 0.75}, time.time()),
+            live.encode_osc_frame({"Smile": 1.0, "Blink_L": 0.5}),
+        ]
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            for frame in frames:
+                sock.sendto(frame, (live.DEFAULT_HOST, listener.port))
+        deadline = time.monotonic() + 2.0
+        while listener.stats.received + listener.stats.errors < len(frames) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert listener.poll() == {"Smile": 1.0, "Blink_L": 0.5}
+        assert listener.poll() is None
+        summary = listener.get_summary()
+        received = len(frames) - 1
+        assert (summary["received"], summary["applied"], summary["dropped"], summary["errors"]) == (
+            received, 1, received - 1, 1)
+    finally:
+        started = time.monotonic()
+        listener.stop()
+    assert time.monotonic() - started < 1.0
+    assert not thread.is_alive()
+    assert not listener.running